@@ -2,4 +2,6 @@
 # from list import UnrolledLinkedList
 # rather than
 # from list.unrolled_linked_list import UnrolledLinkedList
-from unrolled_linked_list import UnrolledLinkedList
+from unrolled_linked_list import (UnrolledLinkedList, SortedUnrolledLinkedList,
+                                 DiskUnrolledLinkedList,
+                                 ConcurrentUnrolledLinkedList)
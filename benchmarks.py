@@ -0,0 +1,247 @@
+import argparse
+import json
+import platform
+import random
+import sys
+from collections import deque
+from copy import copy
+from timeit import default_timer
+
+from unrolled_linked_list import UnrolledLinkedList
+
+__author__ = 'Chad Bacon'
+__email__ = 'chadsbacon@gmail.com'
+
+'''
+Benchmarks for the unrolled linked list against `list` and
+`collections.deque`.
+
+To run every size from 10^3 to 10^7 over the default capacities:
+    `python benchmarks.py --output results.json`
+To check a later run for regressions against those results:
+    `python benchmarks.py --compare results.json`
+which exits with status 1 if any UnrolledLinkedList timing is more than
+`--tolerance` slower; `list` and `deque` are timed for reference only.
+'''
+
+SIZES = [10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6, 10 ** 7]
+CAPACITIES = [8, 16, 32, 64, 128]
+MIN_TIME = 0.2
+
+
+def bench_append(container, size):
+    # Appends go to a copy that keeps growing while it is timed, so the cost
+    # of starting new nodes is included and the shared container is left as
+    # it was
+    container = copy(container)
+
+    def run():
+        for i in xrange(100):
+            container.append(i)
+    return run
+
+
+def bench_getitem(container, size):
+    indexes = [random.randrange(size) for _ in xrange(100)]
+
+    def run():
+        for i in indexes:
+            container[i]
+    return run
+
+
+def bench_setitem(container, size):
+    indexes = [random.randrange(size) for _ in xrange(100)]
+
+    def run():
+        for i in indexes:
+            container[i] = i
+    return run
+
+
+def bench_delitem(container, size):
+    # Each delete is paired with an append so the size stays the same
+    indexes = [random.randrange(size - 1) for _ in xrange(100)]
+
+    def run():
+        for i in indexes:
+            del container[i]
+            container.append(i)
+    return run
+
+
+def bench_slice(container, size):
+    start = size / 4
+
+    def run():
+        container[start:start + 1000]
+    return run
+
+
+def bench_contains(container, size):
+    def run():
+        -1 in container
+    return run
+
+
+def bench_iter(container, size):
+    def run():
+        for _ in container:
+            pass
+    return run
+
+
+def bench_reversed(container, size):
+    def run():
+        for _ in reversed(container):
+            pass
+    return run
+
+
+def bench_add(container, size):
+    def run():
+        container + container
+    return run
+
+
+def bench_mul(container, size):
+    def run():
+        container * 2
+    return run
+
+
+# The number of operations each benchmark's `run` performs per call
+OPERATIONS = [
+    ('append', bench_append, 100),
+    ('getitem', bench_getitem, 100),
+    ('setitem', bench_setitem, 100),
+    ('delitem', bench_delitem, 100),
+    ('slice', bench_slice, 1),
+    ('contains', bench_contains, 1),
+    ('iter', bench_iter, 1),
+    ('reversed', bench_reversed, 1),
+    ('add', bench_add, 1),
+    ('mul', bench_mul, 1),
+]
+
+# Operations `collections.deque` doesn't have on this Python
+DEQUE_UNSUPPORTED = set(['slice', 'add', 'mul'])
+
+
+def time_batch(run, number):
+    start = default_timer()
+    for _ in xrange(number):
+        run()
+    return default_timer() - start
+
+
+def time_call(run, repeat=3):
+    """Returns the time for one call of `run`. Batches double in size until
+    one takes at least MIN_TIME, and the best of `repeat` batches of that
+    size is used.
+    """
+    number = 1
+    while time_batch(run, number) < MIN_TIME:
+        number *= 2
+    return min(time_batch(run, number) for _ in xrange(repeat)) / number
+
+
+def containers(size, capacities):
+    """Yields a `(name, capacity, container)` for each container type of
+    the given size.
+    """
+    yield 'list', None, list(xrange(size))
+    yield 'deque', None, deque(xrange(size))
+    for capacity in capacities:
+        yield ('UnrolledLinkedList', capacity,
+               UnrolledLinkedList(xrange(size), max_node_capacity=capacity))
+
+
+def run_benchmarks(sizes, capacities, ops):
+    """Runs each operation against each container and returns a list of
+    result dicts with the time per operation in seconds.
+    """
+    results = []
+    for size in sizes:
+        for name, capacity, container in containers(size, capacities):
+            for op, bench, count in OPERATIONS:
+                if op not in ops:
+                    continue
+                if name == 'deque' and op in DEQUE_UNSUPPORTED:
+                    continue
+                random.seed(size)
+                seconds = time_call(bench(container, size)) / count
+                results.append({'op': op, 'container': name,
+                                'capacity': capacity, 'size': size,
+                                'seconds': seconds})
+                sys.stderr.write('%-8s %-18s %4s %9d  %.3es\n' % (
+                    op, name, capacity or '', size, seconds))
+    return results
+
+
+def result_key(result):
+    return (result['op'], result['container'], result['capacity'],
+            result['size'])
+
+
+def compare(results, baseline, tolerance):
+    """Returns the UnrolledLinkedList results more than `tolerance` (a
+    fraction) slower than the matching baseline result, as
+    `(result, baseline_seconds)` pairs. The `list` and `deque` results are
+    not checked: they are only run for reference and vary with the machine.
+    """
+    baseline_seconds = dict((result_key(result), result['seconds'])
+                            for result in baseline)
+    regressions = []
+    for result in results:
+        if result['container'] != 'UnrolledLinkedList':
+            continue
+        seconds = baseline_seconds.get(result_key(result))
+        if seconds is not None and result['seconds'] > seconds * (
+                1 + tolerance):
+            regressions.append((result, seconds))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Benchmark UnrolledLinkedList against list and deque')
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES)
+    parser.add_argument('--capacities', type=int, nargs='+',
+                        default=CAPACITIES)
+    parser.add_argument('--ops', nargs='+',
+                        default=[op for op, bench, count in OPERATIONS],
+                        choices=[op for op, bench, count in OPERATIONS])
+    parser.add_argument('--output', help='write the results as JSON here')
+    parser.add_argument('--compare', metavar='BASELINE',
+                        help='fail if slower than these JSON results')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='allowed slowdown for --compare (0.25 = 25%%)')
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.sizes, args.capacities, set(args.ops))
+    report = {'python': platform.python_version(),
+              'platform': platform.platform(),
+              'results': results}
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+    else:
+        json.dump(report, sys.stdout, indent=2, sort_keys=True)
+        sys.stdout.write('\n')
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)['results']
+        regressions = compare(results, baseline, args.tolerance)
+        for result, seconds in regressions:
+            sys.stderr.write('REGRESSION %s %s %s %d: %.3es -> %.3es\n' % (
+                result['op'], result['container'], result['capacity'],
+                result['size'], seconds, result['seconds']))
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
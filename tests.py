@@ -1,5 +1,20 @@
+import math
+import operator
+import os
+import pickle
+import random
+import threading
 import unittest
-from unrolled_linked_list import UnrolledLinkedList
+from array import array
+from copy import copy, deepcopy
+from functools import partial
+from multiprocessing.pool import ThreadPool
+from sys import getsizeof
+from tempfile import NamedTemporaryFile, TemporaryFile
+import unrolled_linked_list
+from unrolled_linked_list import (UnrolledLinkedList, SortedUnrolledLinkedList,
+                                 DiskUnrolledLinkedList,
+                                 ConcurrentUnrolledLinkedList)
 
 __author__ = 'Chad Bacon'
 __email__ = 'chadsbacon@gmail.com'
@@ -112,6 +127,889 @@ class ExampleTest(unittest.TestCase):
         self.assertEqual(len(list1) + len(list2), len(test_list))
         self.assertEqual([18, 19, 20], test_list.tail.data_list)
 
+    def test_copy(self):
+        item = ['mutable']
+        l = UnrolledLinkedList([item] + range(10), max_node_capacity=4)
+        new_list = l.copy()
+        self.assertEqual(str(l), str(new_list))
+        self.assertIs(item, new_list[0])
+        new_list.append(10)
+        self.assertEqual(11, len(l))
+        self.assertEqual(12, len(new_list))
+
+        new_list = copy(l)
+        self.assertEqual(str(l), str(new_list))
+        self.assertEqual(4, new_list.max_node_capacity)
+        self.assertIsNot(l.head, new_list.head)
+
+        l = UnrolledLinkedList(range(10000), max_node_capacity=2)
+        new_list = l + UnrolledLinkedList([-1])
+        self.assertEqual(10001, len(new_list))
+        self.assertEqual(-1, new_list[-1])
+
+        list2 = new_list
+        new_list += l
+        self.assertIs(list2, new_list)
+        self.assertEqual(20001, len(new_list))
+        self.assertRaises(TypeError, new_list.__iadd__, [1])
+
+    def test_deque_ops(self):
+        l = UnrolledLinkedList(4)
+        self.assertRaises(IndexError, l.pop)
+        self.assertRaises(IndexError, l.popleft)
+
+        for i in range(10):
+            l.appendleft(i)
+        self.assertEqual(range(9, -1, -1), list(l))
+        self.assertEqual(range(10), list(reversed(l)))
+
+        l.extendleft('abc')
+        self.assertEqual(['c', 'b', 'a'] + range(9, -1, -1), list(l))
+        self.assertEqual('c', l.popleft())
+        self.assertEqual(0, l.pop())
+        self.assertEqual(6, l.pop(5))
+        self.assertEqual(['b', 'a', 9, 8, 7, 5, 4, 3, 2, 1], list(l))
+
+        while len(l) > 1:
+            l.popleft()
+            self.assertIsNone(l.head.prev_node)
+            self.assertIs(l.tail.prev_node is None, l.head is l.tail)
+        self.assertEqual(1, l.pop())
+        self.assertIsNone(l.head)
+        self.assertIsNone(l.tail)
+
+        l.extendleft(range(5))
+        self.assertEqual(range(4, -1, -1), list(l))
+        self.assertEqual(range(5), list(reversed(l)))
+
+    def test_compact(self):
+        l = UnrolledLinkedList(range(100), max_node_capacity=8, compact=True)
+        self.assertTrue(l.preallocate)
+        self.assertFalse(hasattr(l, '__dict__'))
+        self.assertFalse(hasattr(l.head, '__dict__'))
+        self.assertEqual(range(100), list(l))
+
+        full_size = getsizeof(range(8))
+        self.assertEqual(full_size, getsizeof(l.head.data_list))
+        del l[1]
+        l.append(100)
+        l[2:2] = UnrolledLinkedList([-1, -2])
+        self.assertEqual([0, 2, -1, -2] + range(3, 101), list(l))
+        cur_node = l.head
+        while cur_node is not l.tail:
+            self.assertEqual(full_size, getsizeof(cur_node.data_list))
+            cur_node = cur_node.next_node
+        self.assertTrue(l[10:20].preallocate)
+
+        self.assertTrue(getsizeof(l) > getsizeof(UnrolledLinkedList()))
+        self.assertTrue(getsizeof(UnrolledLinkedList(range(100))) >
+                        getsizeof(range(100)))
+
+    def test_typed(self):
+        self.assertRaises(ValueError, UnrolledLinkedList, typecode='?')
+
+        l = UnrolledLinkedList(range(20), max_node_capacity=4, typecode='d')
+        self.assertEqual('d', l.typecode)
+        self.assertIsInstance(l.head.data_list, array)
+        self.assertEqual('{[0.0, 1.0, 2.0, 3.0], [4.0, 5.0, 6.0, 7.0], '
+                         '[8.0, 9.0, 10.0, 11.0], [12.0, 13.0, 14.0, 15.0], '
+                         '[16.0, 17.0, 18.0, 19.0]}', str(l))
+        self.assertTrue(3 in l)
+        self.assertFalse(3.5 in l)
+
+        l.append(20)
+        l.appendleft(-1)
+        l[0] = 0.5
+        self.assertRaises(TypeError, l.__setitem__, 1, 'one')
+        del l[3:10]
+        l[2:2] = UnrolledLinkedList([7, 8, 9])
+        l[::5] = UnrolledLinkedList(range(len(l[::5])))
+        expected = [0.5] + range(21)
+        del expected[3:10]
+        expected[2:2] = [7, 8, 9]
+        expected[::5] = range(len(expected[::5]))
+        self.assertEqual(expected, list(l))
+        self.assertEqual(expected[::-1], list(reversed(l)))
+
+        new_list = l[1:10]
+        self.assertEqual('d', new_list.typecode)
+        self.assertEqual(expected[1:10], list(new_list))
+        cur_node = l.head
+        while cur_node is not None:
+            self.assertIsInstance(cur_node.data_list, array)
+            cur_node = cur_node.next_node
+
+        floats = [float(i) for i in range(1000)]
+        self.assertTrue(getsizeof(UnrolledLinkedList(floats, typecode='d')) <
+                        getsizeof(floats) + sum(map(getsizeof, floats)) / 2)
+
+    def test_typed_rejects(self):
+        # An item that doesn't fit the typecode leaves the list as it was
+        l = UnrolledLinkedList([1, 2], max_node_capacity=4, typecode='l')
+        self.assertRaises(TypeError, l.extend, [3, 'x'])
+        self.assertRaises(TypeError, l.extend, 'ab')
+        self.assertRaises(TypeError, l.extendleft, [3, 'x'])
+        self.assertRaises(TypeError, l.append, 'x')
+        self.assertRaises(TypeError, l.appendleft, 'x')
+        self.assertEqual(2, len(l))
+        self.assertEqual([1, 2], list(l))
+
+        l = UnrolledLinkedList(range(10), max_node_capacity=4, typecode='l')
+        self.assertRaises(TypeError, l.__setitem__, slice(2, 4),
+                          UnrolledLinkedList(['a', 'b']))
+        self.assertRaises(TypeError, l.__setitem__, slice(2, 2),
+                          UnrolledLinkedList([1.5]))
+        self.assertEqual(10, len(l))
+        self.assertEqual(range(10), list(l))
+        self.assertEqual(range(10), [x for chunk in l.iter_chunks()
+                                     for x in chunk])
+
+    def check_aggregates(self, typecode):
+        items = [5, -3, 12, 7, 12, 0, -8, 4, 9]
+        l = UnrolledLinkedList(items, max_node_capacity=2, typecode=typecode)
+        self.assertEqual(sum(items), l.sum())
+        self.assertEqual(min(items), l.min())
+        self.assertEqual(max(items), l.max())
+        self.assertAlmostEqual(sum(items) / float(len(items)), l.mean())
+        self.assertEqual(2, l.argmax())
+
+        new_list = l.filter(lambda data: [x > 4 for x in data])
+        self.assertEqual([5, 12, 7, 12, 9], list(new_list))
+        self.assertEqual(typecode, new_list.typecode)
+
+        l = UnrolledLinkedList(typecode=typecode)
+        self.assertEqual(0, l.sum())
+        self.assertRaises(ValueError, l.min)
+        self.assertRaises(ValueError, l.max)
+        self.assertRaises(ValueError, l.mean)
+        self.assertRaises(ValueError, l.argmax)
+        self.assertEqual(0, len(l.filter(lambda data: data)))
+
+    def test_aggregates(self):
+        for typecode in (None, 'l', 'd'):
+            self.check_aggregates(typecode)
+
+    def test_aggregates_without_numpy(self):
+        numpy = unrolled_linked_list.numpy
+        unrolled_linked_list.numpy = None
+        try:
+            for typecode in (None, 'l', 'd'):
+                self.check_aggregates(typecode)
+            self.assertRaises(ImportError, UnrolledLinkedList().to_numpy)
+        finally:
+            unrolled_linked_list.numpy = numpy
+
+    def test_aggregates_untyped(self):
+        # Untyped items keep their Python semantics, NumPy or not
+        l = UnrolledLinkedList([2 ** 62] * 4, max_node_capacity=2)
+        self.assertEqual(2 ** 64, l.sum())
+        l = UnrolledLinkedList(['b', 'a', 'c'], max_node_capacity=2)
+        self.assertEqual('a', l.min())
+        self.assertEqual('c', l.max())
+        self.assertEqual(2, l.argmax())
+
+        seen = []
+
+        def mask_fn(data):
+            seen.append(type(data))
+            return [x > 0 for x in data]
+
+        numpy = unrolled_linked_list.numpy
+        for installed in (numpy, None):
+            unrolled_linked_list.numpy = installed
+            try:
+                for typecode in (None, 'l'):
+                    l = UnrolledLinkedList(range(-3, 4), max_node_capacity=3,
+                                           typecode=typecode)
+                    self.assertEqual([1, 2, 3], list(l.filter(mask_fn)))
+            finally:
+                unrolled_linked_list.numpy = numpy
+        self.assertEqual([list] * 3 + [array] * 3 + [list] * 3 + [array] * 3,
+                         seen)
+
+    @unittest.skipIf(unrolled_linked_list.numpy is None, "requires NumPy")
+    def test_to_numpy(self):
+        l = UnrolledLinkedList(range(10), max_node_capacity=3, typecode='d')
+        self.assertEqual(range(10), l.to_numpy().tolist())
+        self.assertEqual('float64', str(l.to_numpy().dtype))
+        self.assertEqual(0, len(UnrolledLinkedList().to_numpy()))
+
+        new_list = l.filter(lambda data: [x % 2 == 0 for x in data])
+        self.assertEqual(range(0, 10, 2), list(new_list))
+
+    def test_cursor(self):
+        l = UnrolledLinkedList(range(10), max_node_capacity=4)
+        self.assertRaises(TypeError, l.cursor, '0')
+        self.assertRaises(IndexError, l.cursor, 11)
+        self.assertRaises(IndexError, l.cursor, -1)
+
+        cursor = l.cursor(3)
+        self.assertEqual(3, cursor.get())
+        self.assertEqual(3, cursor.next())
+        self.assertEqual(4, cursor.next())
+        self.assertEqual(4, cursor.prev())
+        cursor.seek(4)
+        self.assertEqual(8, cursor.get())
+        cursor.seek(-8)
+        self.assertEqual(0, cursor.index)
+        self.assertRaises(IndexError, cursor.prev)
+        self.assertRaises(IndexError, cursor.seek, 11)
+
+        cursor.seek(5)
+        for c in 'abcdef':
+            cursor.insert_here(c)
+        self.assertEqual(range(5) + list('abcdef') + range(5, 10), list(l))
+        self.assertEqual(11, cursor.index)
+        self.assertEqual(5, cursor.get())
+
+        cursor.set('five')
+        cursor.seek(-6)
+        self.assertEqual('a', cursor.delete_here())
+        self.assertEqual('b', cursor.delete_here())
+        self.assertEqual('c', cursor.get())
+        self.assertEqual(range(5) + list('cdef') + ['five'] + range(6, 10),
+                         list(l))
+
+        cursor = l.cursor(len(l))
+        self.assertRaises(IndexError, cursor.get)
+        self.assertRaises(IndexError, cursor.delete_here)
+        cursor.insert_here(10)
+        self.assertEqual(10, l[-1])
+        self.assertEqual(10, cursor.prev())
+        self.assertEqual(9, cursor.prev())
+        self.assertEqual(9, cursor.delete_here())
+        self.assertEqual(10, cursor.get())
+
+        # Changes made other than through the cursor are picked up
+        l.appendleft(-1)
+        del l[-1]
+        self.assertEqual(7, cursor.prev())
+        self.assertEqual(12, cursor.index)
+
+        l = UnrolledLinkedList(max_node_capacity=2)
+        cursor = l.cursor()
+        cursor.insert_here(1)
+        cursor.seek(-1)
+        self.assertEqual(1, cursor.delete_here())
+        self.assertEqual(0, len(l))
+        self.assertIsNone(l.head)
+
+    def test_sequential_access(self):
+        l = UnrolledLinkedList(range(100), max_node_capacity=4)
+        for i in range(100):
+            self.assertEqual(i, l[i])
+        for i in reversed(range(100)):
+            self.assertEqual(i, l[i])
+        for i in range(0, 100, 7):
+            l[i] = -i
+        self.assertEqual(-14, l[14])
+
+        # Mutations between lookups must not leave a stale position behind
+        l = UnrolledLinkedList(range(100), max_node_capacity=4)
+        for i in range(50):
+            self.assertEqual(i * 2 + 1, l[i + 1])
+            del l[i]
+            l.append(i)
+        self.assertEqual(range(1, 100, 2), list(l)[:50])
+        self.assertEqual(range(50), list(l)[50:])
+
+    def test_adaptive(self):
+        # Reads that walk far with no edits favour the largest nodes
+        l = UnrolledLinkedList(range(2000), max_node_capacity=16,
+                               adaptive=True)
+        for i in range(2000):
+            self.assertEqual(i * 7 % 2000, l[i * 7 % 2000])
+        self.assertEqual(l.ADAPTIVE_MAX_CAPACITY, l.max_node_size)
+        self.assertEqual(range(2000), list(l))
+
+        # Edits at the head shift whole nodes but never walk
+        for i in range(2000):
+            l.appendleft(l.pop(0))
+        self.assertEqual(l.ADAPTIVE_MIN_CAPACITY, l.max_node_size)
+        self.assertEqual(range(2000), list(l))
+        node = l.head
+        while node is not None:
+            self.assertTrue(len(node.data_list) <= l.max_node_size)
+            node = node.next_node
+
+        # A fixed list keeps its capacity
+        l = UnrolledLinkedList(range(2000), max_node_capacity=16)
+        for i in range(2000):
+            l[i * 7 % 2000]
+        self.assertEqual(16, l.max_node_size)
+
+        # A large list re-chunks as soon as its reads have paid for it
+        l = UnrolledLinkedList(range(50000), max_node_capacity=16,
+                               adaptive=True)
+        for i in range(100):
+            l[i * 7919 % 50000]
+        self.assertEqual(l.ADAPTIVE_MAX_CAPACITY, l.max_node_size)
+
+        # Appends count towards the operation mix
+        class FreeRechunks(UnrolledLinkedList):
+            ADAPTIVE_MOVE_COST = ADAPTIVE_NODE_COST = 0
+        l = FreeRechunks(max_node_capacity=16, adaptive=True)
+        for i in range(l.ADAPTIVE_WINDOW + 1):
+            l.append(i)
+        self.assertEqual(l.ADAPTIVE_MAX_CAPACITY, l.max_node_size)
+        self.assertEqual(range(l.ADAPTIVE_WINDOW + 1), list(l))
+
+    def test_stats(self):
+        l = UnrolledLinkedList(4)
+        self.assertIsNone(l.stats)
+        events = []
+        stats = l.enable_stats(lambda event, count: events.append(event))
+        self.assertIs(stats, l.enable_stats())
+
+        for i in range(8):
+            l.append(i)
+        self.assertEqual('{[0, 1], [2, 3], [4, 5, 6, 7]}', str(l))
+        self.assertEqual(2, stats.splits)
+        self.assertEqual(['splits', 'splits'], events)
+
+        self.assertEqual(0, l[0])
+        self.assertEqual(1, stats.lookups)
+        self.assertEqual(0, stats.nodes_traversed)
+        self.assertEqual(2, l[2])
+        self.assertEqual(1, stats.nodes_traversed)
+
+        del l[2]  # borrows from the tail
+        del l[0]  # merges the next node in
+        self.assertEqual('{[1, 3, 4], [5, 6, 7]}', str(l))
+        self.assertEqual(1, stats.borrows)
+        self.assertEqual(1, stats.merges)
+        self.assertEqual(1, stats.unlinks)
+        self.assertEqual([0, 0, 0, 2], l.fill_histogram(4))
+
+        self.assertIs(stats, l.disable_stats())
+        self.assertIsNone(l.stats)
+        l.append(8)
+        l.append(9)
+        self.assertEqual(2, stats.splits)
+        stats.reset()
+        self.assertEqual(0, stats.as_dict()['lookups'])
+
+    def test_compact_fill(self):
+        l = UnrolledLinkedList(range(64), max_node_capacity=8)
+        del l[::2]
+        self.assertEqual(8, l.memory_usage()['nodes'])
+        l.compact()
+        self.assertEqual('{[1, 3, 5, 7, 9, 11, 13, 15], '
+                         '[17, 19, 21, 23, 25, 27, 29, 31], '
+                         '[33, 35, 37, 39, 41, 43, 45, 47], '
+                         '[49, 51, 53, 55, 57, 59, 61, 63]}', str(l))
+        l.compact(0.75)
+        sizes = []
+        cur_node = l.head
+        while cur_node is not None:
+            sizes.append(len(cur_node.data_list))
+            cur_node = cur_node.next_node
+        self.assertEqual([6, 6, 6, 6, 8], sizes)
+        self.assertEqual(range(1, 64, 2), list(l))
+        self.assertEqual(63, l[-1])
+        self.failUnlessRaises(ValueError, l.compact, 0.4)
+
+        l = UnrolledLinkedList(max_node_capacity=8)
+        l.compact()
+        self.assertEqual('{}', str(l))
+
+    def test_memory_usage(self):
+        usage = UnrolledLinkedList(range(100), max_node_capacity=8,
+                                   typecode='l').memory_usage()
+        self.assertEqual(13, usage['nodes'])
+        self.assertEqual(100, usage['items'])
+        self.assertAlmostEqual(100 / 104.0, usage['fill_ratio'])
+        self.assertEqual(100 * array('l').itemsize, usage['payload_bytes'])
+        self.assertTrue(usage['node_bytes'] > 0)
+
+        l = UnrolledLinkedList(range(1000, 1100), max_node_capacity=8)
+        usage = l.memory_usage()
+        self.assertEqual(getsizeof(l), usage['node_bytes'])
+        self.assertEqual(100 * getsizeof(1000), usage['payload_bytes'])
+        self.assertEqual(0.0, UnrolledLinkedList().memory_usage()['fill_ratio'])
+
+    def test_sorted(self):
+        l = SortedUnrolledLinkedList([5, 1, 4, 1, 3], max_node_capacity=4)
+        self.assertEqual([1, 1, 3, 4, 5], list(l))
+        for value in [2, 6, 0, 4, 4]:
+            l.add(value)
+        self.assertEqual([0, 1, 1, 2, 3, 4, 4, 4, 5, 6], list(l))
+        self.assertEqual(10, len(l))
+
+        self.assertEqual(1, l.bisect_left(1))
+        self.assertEqual(3, l.bisect_right(1))
+        self.assertEqual(5, l.index(4))
+        self.assertEqual(6, l.index(4, 6))
+        self.assertEqual(7, l.index(4, -3, -2))
+        self.failUnlessRaises(ValueError, l.index, 4, 8)
+        self.failUnlessRaises(ValueError, l.index, 4, 0, 5)
+        self.assertEqual(10, l.bisect_left(7))
+        self.failUnlessRaises(ValueError, l.index, 7)
+        self.assertTrue(4 in l)
+        self.assertFalse(7 in l)
+
+        self.assertEqual([1, 1, 2, 3, 4, 4, 4], list(l.irange(1, 4)))
+        self.assertEqual([2, 3], list(l.irange(1, 4, (False, False))))
+        self.assertEqual([5, 6], list(l.irange(5)))
+        self.assertEqual([0, 1, 1], list(l.irange(maximum=1)))
+
+        l.discard(4)
+        l.discard(7)
+        l.discard(0)
+        self.assertEqual([1, 1, 2, 3, 4, 4, 5, 6], list(l))
+        del l[0]
+        l.update([8, 2])
+        self.assertEqual([1, 2, 2, 3, 4, 4, 5, 6, 8], list(l))
+        self.assertEqual(4, l.index(4))
+
+        self.assertIsInstance(copy(l), SortedUnrolledLinkedList)
+        self.assertEqual(list(l), list(copy(l)))
+        self.failUnlessRaises(TypeError, l.append, 0)
+        self.failUnlessRaises(TypeError, l.__setitem__, 0, 9)
+        self.failUnlessRaises(TypeError, l.extend, [0])
+
+        l = SortedUnrolledLinkedList([1, 2, 3, 4, 5], max_node_capacity=2)
+        cursor = l.cursor(0)
+        self.failUnlessRaises(TypeError, cursor.set, 99)
+        self.failUnlessRaises(TypeError, cursor.insert_here, 99)
+        self.failUnlessRaises(TypeError, l.cursor(5).insert_here, 0)
+        self.assertEqual(1, cursor.delete_here())
+        self.assertEqual([2, 3, 4, 5], list(l))
+        self.assertTrue(2 in l)
+        l.add(1)
+        self.assertEqual([1, 2, 3, 4, 5], list(l))
+
+        new_list = SortedUnrolledLinkedList([3, 1]) + UnrolledLinkedList([5])
+        self.assertEqual(UnrolledLinkedList, type(new_list))
+        self.assertEqual([1, 3, 5], list(new_list))
+        new_list = UnrolledLinkedList([5]) + SortedUnrolledLinkedList([3, 1])
+        self.assertEqual([5, 1, 3], list(new_list))
+        self.failUnlessRaises(TypeError, l.__add__, [5])
+        self.assertEqual([], list(SortedUnrolledLinkedList().irange(1)))
+
+    def test_index(self):
+        for settings in [{}, {'typecode': 'l'}, {'indexed': True}]:
+            l = UnrolledLinkedList([1, 2, 3, 1], max_node_capacity=2,
+                                   **settings)
+            self.assertEqual(0, l.index(1))
+            self.assertEqual(3, l.index(1, 2))
+            self.assertEqual(3, l.index(1, 1))
+            self.assertEqual(3, l.index(1, -1))
+            self.assertEqual(1, l.index(2, -10, 10))
+            self.failUnlessRaises(ValueError, l.index, 9, 2)
+            self.failUnlessRaises(ValueError, l.index, 1, 1, 3)
+            self.failUnlessRaises(ValueError, l.index, 1, 4)
+            self.failUnlessRaises(ValueError, l.index, 3, 3, 1)
+
+            items = range(50) * 2
+            l = UnrolledLinkedList(items, max_node_capacity=4, **settings)
+            for start in range(-5, 105, 7):
+                for stop in range(-5, 105, 9):
+                    for item in (0, 13, 49):
+                        try:
+                            expected = items.index(item, start, stop)
+                        except ValueError:
+                            self.failUnlessRaises(ValueError, l.index, item,
+                                                  start, stop)
+                        else:
+                            self.assertEqual(expected,
+                                             l.index(item, start, stop))
+
+    def test_summaries(self):
+        l = UnrolledLinkedList(range(100), max_node_capacity=8,
+                               summaries=True)
+        self.assertTrue(50 in l)
+        self.assertFalse(100 in l)
+        self.assertEqual(50, l.index(50))
+        self.failUnlessRaises(ValueError, l.index, 100)
+        self.failUnlessRaises(ValueError, l.index, 50, 51)
+        self.failUnlessRaises(ValueError, l.index, 50, 0, 50)
+        self.assertEqual(50, l.index(50, 50, 51))
+
+        # Only nodes that may hold the item are searched
+        self.assertTrue(all(node.summary is not None
+                            for node in [l.head, l.tail]))
+        l.tail.summary = 0
+        self.assertFalse(99 in l)
+        l.tail.summary = None
+        self.assertTrue(99 in l)
+
+        l[3] = 'x'
+        l.append(100)
+        l.appendleft(-1)
+        l[10:10] = UnrolledLinkedList(['y', 'z'])
+        del l[20:40]
+        for item in ['x', 100, -1, 'y', 'z', 50]:
+            self.assertTrue(item in l)
+        for item in [3, 30, 'w']:
+            self.assertFalse(item in l)
+        self.assertEqual(10, l.index('y'))
+
+        # Unhashable items are searched for node by node
+        l.append([1])
+        self.assertTrue([1] in l)
+        self.assertFalse([2] in l)
+        self.assertTrue(l[:5].summaries)
+
+    def test_value_index(self):
+        l = UnrolledLinkedList([3, 1, 4, 1, 5, 9, 2, 6], max_node_capacity=4,
+                               value_index=True)
+        self.assertEqual(2, l.count(1))
+        self.assertEqual(0, l.count(7))
+        self.assertEqual(0, l.count([1]))
+        self.assertTrue(9 in l)
+        self.assertFalse(7 in l)
+        self.assertEqual(1, l.index(1))
+
+        l.remove(1)
+        self.assertEqual([3, 4, 1, 5, 9, 2, 6], list(l))
+        self.failUnlessRaises(ValueError, l.remove, 7)
+        l[0] = 7
+        l.append(7)
+        l.appendleft(8)
+        l[2:4] = UnrolledLinkedList([1, 1, 1])
+        del l[5:7]
+        self.assertEqual([8, 7, 1, 1, 1, 2, 6, 7], list(l))
+        self.assertEqual(3, l.count(1))
+        self.assertEqual(2, l.count(7))
+        self.assertEqual(0, l.count(4))
+        self.assertEqual(5, l.index(2))
+        self.failUnlessRaises(ValueError, l.index, 9)
+        self.assertEqual(3, l[1:5].count(1))
+        self.assertEqual(1, l.copy().count(8))
+
+        # Unhashable items are refused before the list is changed
+        self.failUnlessRaises(TypeError, l.append, [1])
+        self.failUnlessRaises(TypeError, l.extend, [[1]])
+        self.failUnlessRaises(TypeError, l.__setitem__, 0, [1])
+        self.assertEqual(8, len(l))
+        self.assertEqual(8, l[0])
+        l.clear()
+        self.assertEqual(0, l.count(7))
+
+        # Without the index the same methods scan
+        l = UnrolledLinkedList([3, 1, 4, 1, 5], max_node_capacity=2)
+        self.assertEqual(2, l.count(1))
+        l.remove(1)
+        self.assertEqual([3, 4, 1, 5], list(l))
+
+        # A typed item the node can't hold raises before it is counted
+        l = UnrolledLinkedList([1, 2], max_node_capacity=2, typecode='l',
+                               value_index=True)
+        self.assertRaises(TypeError, l.append, 'x')
+        self.assertRaises(TypeError, l.appendleft, 'x')
+        self.assertRaises(TypeError, l.__setitem__, 0, 'y')
+        self.assertRaises(TypeError, l.cursor(1).insert_here, 'z')
+        self.assertRaises(TypeError, l.cursor(1).set, 'z')
+        self.assertFalse('x' in l)
+        self.assertTrue(1 in l)
+        self.assertEqual(0, l.index(1))
+        self.assertEqual([1, 2], list(l))
+
+    def test_pickle(self):
+        l = UnrolledLinkedList(range(5000), max_node_capacity=2,
+                               summaries=True)
+        for protocol in range(3):
+            copied = pickle.loads(pickle.dumps(l, protocol))
+            self.assertEqual(list(l), list(copied))
+            self.assertEqual(str(l), str(copied))
+            self.assertTrue(copied.summaries)
+
+        l = UnrolledLinkedList([[1], [2], [3]], max_node_capacity=2)
+        copied = deepcopy(l)
+        self.assertEqual(list(l), list(copied))
+        self.assertIsNot(l[0], copied[0])
+
+        l = pickle.loads(pickle.dumps(SortedUnrolledLinkedList([3, 1]), 2))
+        l.add(2)
+        self.assertEqual([1, 2, 3], list(l))
+
+    def test_dump_load(self):
+        for typecode in [None, 'd']:
+            l = UnrolledLinkedList(range(100), max_node_capacity=8,
+                                   typecode=typecode)
+            del l[::3]
+            fp = TemporaryFile()
+            l.dump(fp)
+
+            fp.seek(0)
+            loaded = UnrolledLinkedList.load(fp)
+            self.assertEqual(str(l), str(loaded))
+            self.assertEqual(typecode, loaded.typecode)
+
+            fp.seek(0)
+            loaded = UnrolledLinkedList.load(fp, lazy=True)
+            self.assertTrue(loaded.indexed)
+            self.assertEqual(len(l), len(loaded))
+            self.assertEqual(l[40], loaded[40])
+            # Only the page looked up has been read in
+            pages = []
+            cur_node = loaded.head
+            while cur_node is not None:
+                pages.append(cur_node.page is None)
+                cur_node = cur_node.next_node
+            self.assertEqual(1, sum(pages))
+            self.assertEqual(list(l), list(loaded))
+            loaded.append(100)
+            del loaded[0]
+            self.assertEqual(list(l)[1:] + [100], list(loaded))
+
+            # An edit at the front doesn't read the pages after it
+            fp.seek(0)
+            loaded = UnrolledLinkedList.load(fp, lazy=True)
+            del loaded[1]
+            self.assertEqual(l[-5], loaded[-5])
+            pages = []
+            cur_node = loaded.head
+            while cur_node is not None:
+                pages.append(cur_node.page is None)
+                cur_node = cur_node.next_node
+            self.assertEqual([True] + [False] * (len(pages) - 2) + [True],
+                             pages)
+
+        fp = TemporaryFile()
+        fp.write('not a list')
+        fp.seek(0)
+        self.failUnlessRaises(ValueError, UnrolledLinkedList.load, fp)
+
+    def test_disk(self):
+        for typecode in [None, 'l']:
+            l = DiskUnrolledLinkedList(max_node_capacity=4, cache_nodes=4,
+                                       typecode=typecode)
+            for i in range(100):
+                l.append(i)
+            resident = 0
+            cur_node = l.head
+            while cur_node is not None:
+                try:
+                    unrolled_linked_list._node_data_list.__get__(cur_node)
+                    resident += 1
+                except AttributeError:
+                    pass
+                cur_node = cur_node.next_node
+            self.assertEqual(4, resident)
+
+            self.assertEqual(range(100), list(l))
+            self.assertEqual(range(99, -1, -1), list(reversed(l)))
+            self.assertEqual(50, l[50])
+            l[50] = -50
+            del l[10]
+            del l[20:30]
+            l.flush()
+            self.assertEqual(-50, l[39])
+            self.assertEqual(range(10) + range(11, 21) + range(31, 50) +
+                             [-50] + range(51, 100), list(l))
+            self.assertEqual(range(5, 10), list(l[5:10]))
+
+            copied = l.copy()
+            self.assertIsInstance(copied, DiskUnrolledLinkedList)
+            self.assertEqual(list(l), list(copied))
+            copied = pickle.loads(pickle.dumps(l, 2))
+            self.assertEqual(list(l), list(copied))
+            self.assertEqual(4, copied.cache_nodes)
+            l.clear()
+            self.assertEqual([], list(l))
+            l.append(1)
+            self.assertEqual([1], list(l))
+
+        l = DiskUnrolledLinkedList(range(5), max_node_capacity=4,
+                                   cache_nodes=4)
+        l.extendleft(range(100))
+        self.assertEqual(range(99, -1, -1) + range(5), list(l))
+        resident = 0
+        cur_node = l.head
+        while cur_node is not None:
+            self.assertIsInstance(cur_node, DiskUnrolledLinkedList.Node)
+            try:
+                unrolled_linked_list._node_data_list.__get__(cur_node)
+                resident += 1
+            except AttributeError:
+                pass
+            cur_node = cur_node.next_node
+        self.assertEqual(4, resident)
+
+        # Pages of unlinked nodes are reused, so churn doesn't grow the file
+        with NamedTemporaryFile() as fp:
+            l = DiskUnrolledLinkedList(range(100), max_node_capacity=8,
+                                       cache_nodes=4, path=fp.name)
+            l.flush()
+            size = os.path.getsize(fp.name)
+            for i in range(2000):
+                l.append(i)
+                l.popleft()
+            l.flush()
+            self.assertLess(os.path.getsize(fp.name), size * 3)
+            del l[::2]
+            l.compact()
+            self.assertEqual(range(1901, 2000, 2), list(l))
+            self.assertEqual(7, len(list(l.iter_chunks())))
+
+        self.failUnlessRaises(AssertionError, DiskUnrolledLinkedList,
+                              cache_nodes=3)
+
+        # Same-size edits are written back: a node is changed once its items
+        # are handed out, and clean again once its page is written
+        l = DiskUnrolledLinkedList(range(40), max_node_capacity=4,
+                                   typecode='l', cache_nodes=4)
+        l.flush()
+        self.assertFalse(l.head.dirty)
+        l[1] = -1
+        self.assertTrue(l.head.dirty)
+        self.assertEqual(range(2, 40), list(l)[2:])
+        self.assertEqual([0, -1, 2, 3], list(l)[:4])
+        self.assertTrue(isinstance(DiskUnrolledLinkedList.Node, type))
+        self.assertIs(DiskUnrolledLinkedList, type(l + UnrolledLinkedList([1])))
+        l.close()
+        self.failUnlessRaises(ValueError, list, l)
+
+    def test_concurrent(self):
+        l = ConcurrentUnrolledLinkedList(4)
+
+        def append_range(start):
+            for i in range(start, start + 500):
+                l.append(i)
+        threads = [threading.Thread(target=append_range, args=(i * 500,))
+                   for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(range(2000), sorted(l))
+
+        def pop_some():
+            for i in range(400):
+                l.pop()
+                l[i] = -1
+        threads = [threading.Thread(target=pop_some) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(400, len(l))
+        self.assertEqual([-1] * 400, list(l))
+
+        snapshot = l.snapshot()
+        self.assertIs(UnrolledLinkedList, type(snapshot))
+        self.assertIsInstance(l.copy(), ConcurrentUnrolledLinkedList)
+        copied = pickle.loads(pickle.dumps(l, 2))
+        self.assertIsInstance(copied, ConcurrentUnrolledLinkedList)
+        self.assertEqual(list(l), list(copied))
+        copied.append(1)
+        self.assertEqual(401, len(copied))
+
+        # The lock is reentrant, but a reader can't start writing
+        with l.lock.writing():
+            with l.lock.reading():
+                l.append(0)
+        with l.lock.reading():
+            self.failUnlessRaises(RuntimeError, l.append, 0)
+        self.failUnlessRaises(TypeError, ConcurrentUnrolledLinkedList,
+                              indexed=True)
+
+        # Nodes packed at the front are the list's own, with their locks
+        l = ConcurrentUnrolledLinkedList(range(4), 4)
+        l.extendleft([9, 8, 7, 6, 5])
+        l[0] = 1
+        l[4] = 0
+        self.assertEqual([1, 6, 7, 8, 0, 0, 1, 2, 3], list(l))
+
+        # An edit in the node being iterated doesn't shift items under it
+        l = ConcurrentUnrolledLinkedList(range(8), max_node_capacity=8)
+        it = iter(l)
+        self.assertEqual([0, 1, 2], [next(it) for i in range(3)])
+        del l[0]
+        self.assertEqual([3, 4, 5, 6, 7], list(it))
+        it = reversed(l)
+        self.assertEqual([7, 6], [next(it) for i in range(2)])
+        l.append(8)
+        del l[-2]
+        self.assertEqual([5, 4, 3, 2, 1], list(it))
+
+    def test_parallel(self):
+        l = UnrolledLinkedList(range(-50, 50), max_node_capacity=4)
+        for threads in [False, True]:
+            mapped = l.parallel_map(abs, workers=2, threads=threads)
+            self.assertIsInstance(mapped, UnrolledLinkedList)
+            self.assertEqual(map(abs, range(-50, 50)), list(mapped))
+            self.assertEqual(filter(None, range(-50, 50)),
+                             list(l.parallel_filter(bool, workers=2,
+                                                    threads=threads)))
+            self.assertEqual(-50, l.parallel_reduce(min, workers=3,
+                                                    threads=threads))
+        self.assertEqual(sum(range(-50, 50)) + 10,
+                         l.parallel_reduce(operator.add, 10, workers=2,
+                                           threads=True))
+
+        pool = ThreadPool(2)
+        self.assertEqual(range(-49, 51),
+                         list(l.parallel_map(partial(operator.add, 1),
+                                             pool=pool)))
+        pool.close()
+
+        l = UnrolledLinkedList([4, 9], typecode='l', value_index=True)
+        mapped = l.parallel_map(math.sqrt, threads=True)
+        self.assertEqual([2.0, 3.0], list(mapped))
+        self.assertIsNone(mapped.typecode)
+        self.assertFalse(mapped.value_index)
+        self.assertEqual(l.max_node_capacity, mapped.max_node_capacity)
+
+        l = UnrolledLinkedList(typecode='l')
+        self.assertEqual([], list(l.parallel_map(abs)))
+        self.failUnlessRaises(TypeError, l.parallel_reduce, min)
+        self.assertEqual(0, l.parallel_reduce(min, 0))
+
+    def test_aextend(self):
+        l = UnrolledLinkedList(max_node_capacity=4)
+        ingest = l.aextend(iter(range(50)), max_length=10)
+        batches = l.aiter_chunks(consume=True)
+        received = []
+        steps = []
+        for added in ingest:
+            steps.append(added)
+            self.assertLessEqual(len(l), 10)
+            if not added:
+                received.extend(next(batches))
+        self.assertEqual([4, 4, 2, 0], steps[:4])
+        self.assertEqual(50, sum(steps))
+        for batch in batches:
+            self.assertLessEqual(len(batch), 4)
+            received.extend(batch)
+        self.assertEqual(range(50), received)
+        self.assertEqual(0, len(l))
+
+        l.extend(range(10))
+        self.assertEqual([[0, 1, 2, 3], [4, 5, 6, 7], [8, 9]],
+                         list(l.aiter_chunks()))
+        self.assertEqual(range(10), list(l))
+        self.assertEqual([], list(UnrolledLinkedList().aiter_chunks(True)))
+
+    def test_chunks(self):
+        l = UnrolledLinkedList(range(10), max_node_capacity=4)
+        self.assertEqual([[0, 1, 2, 3], [4, 5, 6, 7], [8, 9]],
+                         list(l.iter_chunks()))
+        self.assertEqual([[8, 9], [4, 5, 6, 7], [0, 1, 2, 3]],
+                         list(l.iter_chunks_reversed()))
+        for chunk in l.iter_chunks():
+            chunk[0] = None
+        self.assertEqual(range(10), list(l))
+
+        self.assertEqual([[2, 3], [4, 5, 6, 7], [8]], list(l.chunks(2, 9)))
+        self.assertEqual([[5]], list(l.chunks(5, 6)))
+        self.assertEqual([[7], [8, 9]], list(l.chunks(-3)))
+        self.assertEqual([], list(l.chunks(6, 6)))
+        self.assertEqual([], list(l.chunks(20)))
+        self.assertEqual([], list(UnrolledLinkedList().iter_chunks()))
+
+        fp = TemporaryFile()
+        UnrolledLinkedList(['a\n', 'b\n', 'c\n'], 2).writelines(fp)
+        l = UnrolledLinkedList(range(5), max_node_capacity=2, typecode='l')
+        self.assertIsInstance(next(l.iter_chunks()), array)
+        l.writelines(fp)
+        fp.seek(0)
+        self.assertEqual(['a\n', 'b\n', 'c\n'],
+                         [fp.readline() for i in range(3)])
+        self.assertEqual(array('l', range(5)).tostring(), fp.read())
+
     def test_contains(self):
         l = UnrolledLinkedList(5)
 
@@ -169,6 +1067,29 @@ class ExampleTest(unittest.TestCase):
         for i in range(0, 10):
             self.assertEqual((i*2)+1, new_list[i])
 
+        new_list = l[::-1]
+        self.assertEqual(range(19, -1, -1), list(new_list))
+        self.assertEqual(range(17, 2, -3), list(l[17:2:-3]))
+        self.assertEqual(range(2, 19, 4), list(l[2:-1:4]))
+        self.assertEqual(0, len(l[10:5]))
+        self.assertIsNone(l[10:5].head)
+
+        new_list = l[4:16]
+        self.assertEqual('{[4, 5, 6, 7, 8], [9, 10, 11], [12, 13, 14, 15]}',
+                         str(new_list))
+        self.assertEqual(l.max_node_capacity, new_list.max_node_capacity)
+
+        # Partial first and last pieces are evened out with their neighbours
+        l = UnrolledLinkedList(range(12), 4)
+        self.assertEqual('{[3, 4], [5, 6, 7, 8]}', str(l[3:9]))
+        l = UnrolledLinkedList(range(100), 8)
+        for start, stop in [(7, 93), (1, 99), (15, 17), (8, 57)]:
+            new_list = l[start:stop]
+            self.assertEqual(range(start, stop), list(new_list))
+            chunks = list(new_list.iter_chunks())
+            self.assertTrue(len(chunks) == 1 or
+                            min(len(chunk) for chunk in chunks) >= 4)
+
     def test_setitem(self):
         l = UnrolledLinkedList(5)
         for i in range(11):
@@ -241,6 +1162,31 @@ class ExampleTest(unittest.TestCase):
         l[0:2] = t
         self.assertEqual(14, len(l))
 
+        self.assertRaises(TypeError, l.__setitem__, slice(0, 2), [1, 2])
+        self.assertEqual(14, len(l))
+
+        l = UnrolledLinkedList(range(40), max_node_capacity=4)
+        l[10:30] = UnrolledLinkedList(['a', 'b', 'c'])
+        self.assertEqual(range(10) + ['a', 'b', 'c'] + range(30, 40), list(l))
+        cur_node = l.head
+        while cur_node is not l.tail:
+            self.assertTrue(2 <= len(cur_node.data_list) <= 4)
+            cur_node = cur_node.next_node
+
+        l[5:5] = l
+        self.assertEqual(46, len(l))
+        self.assertEqual(range(5) + range(10) + ['a', 'b', 'c'] +
+                         range(30, 40) + range(5, 10) + ['a', 'b', 'c'] +
+                         range(30, 40), list(l))
+
+        l = UnrolledLinkedList(range(10), max_node_capacity=3)
+        l[::3] = UnrolledLinkedList('abcd')
+        self.assertEqual(['a', 1, 2, 'b', 4, 5, 'c', 7, 8, 'd'], list(l))
+        l[::-5] = UnrolledLinkedList('xy')
+        self.assertEqual(['a', 1, 2, 'b', 'y', 5, 'c', 7, 8, 'x'], list(l))
+        self.assertRaises(ValueError, l.__setitem__, slice(None, None, 2),
+                          UnrolledLinkedList('abc'))
+
     def test_mul(self):
         l = UnrolledLinkedList(6)
         l.append(1)
@@ -256,7 +1202,7 @@ class ExampleTest(unittest.TestCase):
         list2 = l * 4
         self.assertEqual(8, len(list2))
         self.assertEqual(6, list2.max_node_capacity)
-        self.assertEqual('{[1, 2, 1], [2, 1, 2, 1, 2]}', str(list2))
+        self.assertEqual('{[1, 2, 1, 2], [1, 2, 1, 2]}', str(list2))
 
         l *= 0
         self.assertEqual(0, len(l))
@@ -267,6 +1213,18 @@ class ExampleTest(unittest.TestCase):
         l *= 10
         self.assertEqual(0, len(l))
 
+        l = UnrolledLinkedList(range(3), max_node_capacity=2)
+        list2 = l
+        l *= 3
+        self.assertIs(list2, l)
+        self.assertEqual(range(3) * 3, list(l))
+        self.assertEqual(0, len(UnrolledLinkedList() * 3))
+        self.assertIsNot(UnrolledLinkedList() * 3, l)
+
+        l = UnrolledLinkedList(range(10000), max_node_capacity=2) * 2
+        self.assertEqual(20000, len(l))
+        self.assertEqual(9999, l[-1])
+
     def test_delitem(self):
         l = UnrolledLinkedList(4)
         l.append('a')
@@ -387,7 +1345,7 @@ class ExampleTest(unittest.TestCase):
 
         del l[:4]
         self.assertEqual(4, len(l))
-        self.assertEqual('{[4, 5], [6, 7]}', str(l))
+        self.assertEqual('{[4, 5, 6, 7]}', str(l))
 
         del l[-50:20]
         self.assertEqual(0, len(l))
@@ -442,6 +1400,22 @@ class ExampleTest(unittest.TestCase):
         del l[::2]
         self.assertEqual('{[1, 3], [5, 7, 9]}', str(l))
 
+        l = UnrolledLinkedList(range(100), max_node_capacity=6)
+        del l[10:90]
+        self.assertEqual(range(10) + range(90, 100), list(l))
+        self.assertEqual('{[0, 1, 2, 3, 4, 5], [6, 7, 8, 9], '
+                         '[90, 91, 92, 93, 94, 95], [96, 97, 98, 99]}', str(l))
+
+        l = UnrolledLinkedList(range(100), max_node_capacity=6)
+        del l[95:5:-3]
+        expected = range(100)
+        del expected[95:5:-3]
+        self.assertEqual(expected, list(l))
+        cur_node = l.head
+        while cur_node is not l.tail:
+            self.assertTrue(3 <= len(cur_node.data_list) <= 6)
+            cur_node = cur_node.next_node
+
     def test_iter(self):
         l = UnrolledLinkedList()
 
@@ -531,5 +1505,63 @@ class ExampleTest(unittest.TestCase):
         self.assertTrue(998 in l)
         self.assertTrue(998, l[0])
 
+    def test_indexed(self):
+        l = UnrolledLinkedList(4, indexed=True)
+        self.assertTrue(l.indexed)
+        self.assertRaises(IndexError, l.__getitem__, 0)
+
+        # The offset index leaves the global random sequence alone
+        random.seed(7)
+        expected = random.random()
+        random.seed(7)
+        UnrolledLinkedList(range(1000), 4, indexed=True)
+        self.assertEqual(expected, random.random())
+
+        for i in range(100):
+            l.append(i)
+        for i in range(100):
+            self.assertEqual(i, l[i])
+        self.assertEqual(99, l[-1])
+
+        for i in reversed(range(0, 100, 3)):
+            del l[i]
+        expected = [i for i in range(100) if i % 3]
+        self.assertEqual(len(expected), len(l))
+        for i, x in enumerate(expected):
+            self.assertEqual(x, l[i])
+
+        l[10] = 'ten'
+        self.assertEqual('ten', l[10])
+        self.assertEqual(expected[11], l[11])
+
+        self.assertTrue((l * 0).indexed)
+        self.assertTrue(l[2:5].indexed)
+
+    def test_extend(self):
+        l = UnrolledLinkedList(range(10), max_node_capacity=4)
+        self.assertEqual(4, l.max_node_capacity)
+        self.assertEqual(10, len(l))
+        self.assertEqual('{[0, 1, 2, 3], [4, 5, 6, 7], [8, 9]}', str(l))
+
+        l.extend(range(10, 13))
+        self.assertEqual(13, len(l))
+        self.assertEqual('{[0, 1, 2, 3], [4, 5, 6, 7], [8, 9], [10, 11, 12]}',
+                         str(l))
+
+        l = UnrolledLinkedList(4)
+        l.extend(range(9))
+        self.assertEqual('{[0, 1, 2, 3], [4, 5], [6, 7, 8]}', str(l))
+        l.extend([])
+        self.assertEqual(9, len(l))
+
+        l = UnrolledLinkedList('abc', max_node_capacity=2)
+        l.extend(l)
+        self.assertEqual(list('abcabc'), list(l))
+        self.assertEqual(l.tail, l.head.next_node.next_node)
+
+        l = UnrolledLinkedList(xrange(1000))
+        self.assertEqual(range(1000), list(l))
+        self.assertEqual(999, l[-1])
+
 if __name__ == '__main__':
     unittest.main()
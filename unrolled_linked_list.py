@@ -1,30 +1,103 @@
-from copy import deepcopy
+import mmap
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+from cPickle import dumps, loads
+from functools import partial, wraps
+from itertools import chain, compress, islice, repeat
+from math import log, sqrt
+from multiprocessing import Pool, cpu_count
+from multiprocessing.pool import ThreadPool
+from random import Random
+from struct import calcsize, pack, unpack_from
+from sys import getsizeof
+from tempfile import TemporaryFile
+from thread import get_ident
+from threading import Condition, Lock
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
 __author__ = 'Chad Bacon'
 __email__ = 'chadsbacon@gmail.com'
 
+# The file format written by `UnrolledLinkedList.dump`: a header, one page per
+# node, then the node directory and a trailer locating it. Typed pages are
+# all max_node_capacity items long; other pages hold a pickled list.
+FILE_MAGIC = 'ULL1'
+FILE_HEADER = '<4sBcIQ14x'  # magic, flags, typecode, capacity, length
+FILE_ENTRY = '<QII'  # page offset, page size, item count
+FILE_TRAILER = '<QQ'  # directory offset, node count
+FILE_FLAGS = ('indexed', 'compact', 'adaptive', 'summaries', 'value_index')
+
+
+# The work done on one run of nodes by `UnrolledLinkedList.parallel_map`,
+# `parallel_filter` and `parallel_reduce`. They are module functions so that
+# a process pool can pickle them.
+def _map_run(fn, data_lists):
+    return [fn(item) for data_list in data_lists for item in data_list]
+
+
+def _filter_run(fn, data_lists):
+    return [item for data_list in data_lists for item in data_list
+            if fn(item)]
+
+
+def _reduce_run(fn, data_lists):
+    return reduce(fn, chain.from_iterable(data_lists))
+
 
 class UnrolledLinkedList(object):
     """ This is the container class for your unrolled linked list """
 
+    __slots__ = ('max_node_capacity', 'length', 'head', 'tail', 'indexed',
+                 'preallocate', 'typecode', 'adaptive', '_version',
+                 '__offsets', '__finger', '__ops',
+                 '__walked', '__shifted', '__spent', 'stats', 'summaries',
+                 'value_index', '__counts')
+
+    # Cost model for `adaptive` mode: the time to step from one node to the
+    # next, to shift one byte of an item within a node's storage, and to
+    # move one item and build one node when re-chunking
+    ADAPTIVE_HOP_COST = 300e-9
+    ADAPTIVE_SHIFT_COST = 0.1e-9
+    ADAPTIVE_MOVE_COST = 50e-9
+    ADAPTIVE_NODE_COST = 4e-6
+    ADAPTIVE_MIN_CAPACITY = 4
+    ADAPTIVE_MAX_CAPACITY = 4096
+    ADAPTIVE_WINDOW = 1024
+    ADAPTIVE_FILL = 0.75  # balancing keeps nodes half to completely full
+
     class Node(object):
         """ This is the node object you should use within your unrolled linked
             list
         """
 
-        def __init__(self, data_list, next_node=None):
+        __slots__ = ('data_list', 'next_node', 'prev_node', 'summary')
+
+        def __init__(self, data_list, next_node=None, prev_node=None):
             """
             :param data_list: Initial list to be stored
             :param next_node: Pointer to the next Node in the Linked List
+            :param prev_node: Pointer to the previous Node in the Linked List
             """
             self.data_list = data_list
             self.next_node = next_node
+            self.prev_node = prev_node
+            # Membership summary of the items (see `summaries`), or None
+            # until it is next needed. Adding items to the node resets it;
+            # removing them leaves it a safe superset.
+            self.summary = None
 
         def append(self, data):
             """Adds an item to the end of this Node's list.
             :param data: data to be added to the Node's list
             """
             self.data_list.append(data)
+            self.summary = None
 
         def __str__(self):
             """ Converts the node's data list to a comma separated string
@@ -39,19 +112,438 @@ class UnrolledLinkedList(object):
 
             return ''.join(str_list)
 
-    def __init__(self, max_node_capacity=16):
+    class PagedNode(Node):
+        """ A node of a list loaded with `UnrolledLinkedList.load(fp,
+            lazy=True)`, whose items are read from its page of the mapped
+            file the first time they are used
+        """
+
+        __slots__ = ('page',)
+
+        def __init__(self, page, next_node=None, prev_node=None):
+            """
+            :param page: A `(buffer, offset, size, typecode)` tuple locating
+                the node's page
+            :param next_node: Pointer to the next Node in the Linked List
+            :param prev_node: Pointer to the previous Node in the Linked List
+            """
+            self.page = page
+            self.next_node = next_node
+            self.prev_node = prev_node
+            self.summary = None
+
+        @property
+        def data_list(self):
+            try:
+                return _node_data_list.__get__(self)
+            except AttributeError:
+                buf, offset, size, typecode = self.page
+                if typecode is None:
+                    data_list = loads(buf[offset:offset + size])
+                else:
+                    data_list = array(typecode)
+                    data_list.fromstring(buf[offset:offset + size])
+                _node_data_list.__set__(self, data_list)
+                self.page = None
+                return data_list
+
+        @data_list.setter
+        def data_list(self, data_list):
+            _node_data_list.__set__(self, data_list)
+            self.page = None
+
+    class OffsetIndex(object):
+        """ The offset index of an `indexed` list: a treap with an entry
+            for each node in list order, where every entry holds the item
+            count of its subtree. Finding the node at a position, and
+            resizing, linking or unlinking a node, each cost O(log nodes).
+        """
+
+        __slots__ = ('root', 'entries')
+
+        # Priorities come from a generator of the index's own, so that
+        # building lists doesn't draw on the caller's `random` sequence
+        __random = Random()
+
+        class Entry(object):
+            """ The tree entry for one node """
+
+            __slots__ = ('node', 'size', 'total', 'priority', 'left',
+                         'right', 'parent')
+
+            def __init__(self, node, size, priority):
+                self.node = node
+                self.size = size
+                self.total = size
+                self.priority = priority
+                self.left = None
+                self.right = None
+                self.parent = None
+
+        def __init__(self):
+            self.root = None
+            self.entries = {}
+
+        def __sizeof__(self):
+            size = object.__sizeof__(self) + getsizeof(self.entries)
+            for entry in self.entries.itervalues():
+                size += getsizeof(entry)
+            return size
+
+        def find(self, index):
+            """Returns the node holding `index` and the index of its first
+            item. An index past the end gives the last node.
+            """
+            entry = self.root
+            start = 0
+            while True:
+                left = entry.left
+                if left is not None:
+                    if index < left.total:
+                        entry = left
+                        continue
+                    index -= left.total
+                    start += left.total
+                if index < entry.size or entry.right is None:
+                    return entry.node, start
+                index -= entry.size
+                start += entry.size
+                entry = entry.right
+
+        def insert(self, prev_node, node, size):
+            """Adds `node`, holding `size` items, just after `prev_node`
+            (or first, if that is None).
+            """
+            entry = self.Entry(node, size, self.__random.random())
+            self.entries[node] = entry
+            if self.root is None:
+                self.root = entry
+                return
+
+            # The entry becomes the right child of `prev_node`'s entry, or
+            # if that has one, the first entry in that child's subtree
+            if prev_node is None:
+                parent, first = self.root, True
+            else:
+                parent = self.entries[prev_node]
+                first = parent.right is not None
+                if first:
+                    parent = parent.right
+            if first:
+                while parent.left is not None:
+                    parent = parent.left
+                parent.left = entry
+            else:
+                parent.right = entry
+            entry.parent = parent
+
+            while parent is not None:
+                parent.total += size
+                parent = parent.parent
+            while (entry.parent is not None and
+                   entry.parent.priority < entry.priority):
+                self.__rotate_up(entry)
+
+        def remove(self, node):
+            """Drops `node` from the index."""
+            entry = self.entries.pop(node)
+            while entry.left is not None and entry.right is not None:
+                if entry.left.priority > entry.right.priority:
+                    self.__rotate_up(entry.left)
+                else:
+                    self.__rotate_up(entry.right)
+
+            child = entry.left if entry.left is not None else entry.right
+            parent = entry.parent
+            if child is not None:
+                child.parent = parent
+            if parent is None:
+                self.root = child
+            elif parent.left is entry:
+                parent.left = child
+            else:
+                parent.right = child
+            while parent is not None:
+                parent.total -= entry.size
+                parent = parent.parent
+
+        def resize(self, node, size):
+            """Records that `node` now holds `size` items."""
+            entry = self.entries[node]
+            delta = size - entry.size
+            if delta:
+                entry.size = size
+                while entry is not None:
+                    entry.total += delta
+                    entry = entry.parent
+
+        def clear(self):
+            """Drops every node from the index."""
+            # Without their parent links the entries are freed at once,
+            # rather than by the cycle collector, along with their nodes
+            for entry in self.entries.itervalues():
+                entry.parent = None
+            self.root = None
+            self.entries = {}
+
+        def __rotate_up(self, entry):
+            """Rotates `entry` above its parent, keeping the list order."""
+            parent = entry.parent
+            grandparent = parent.parent
+            if parent.left is entry:
+                moved = entry.right
+                parent.left = moved
+                entry.right = parent
+            else:
+                moved = entry.left
+                parent.right = moved
+                entry.left = parent
+            if moved is not None:
+                moved.parent = parent
+            parent.parent = entry
+            entry.parent = grandparent
+            if grandparent is None:
+                self.root = entry
+            elif grandparent.left is parent:
+                grandparent.left = entry
+            else:
+                grandparent.right = entry
+
+            entry.total = parent.total
+            parent.total = parent.size
+            if parent.left is not None:
+                parent.total += parent.left.total
+            if parent.right is not None:
+                parent.total += parent.right.total
+
+    class Stats(object):
+        """ Counts of the structural work done by an unrolled linked list,
+            returned by `UnrolledLinkedList.enable_stats`
+        """
+
+        EVENTS = ('splits', 'merges', 'borrows', 'unlinks', 'fills',
+                  'lookups', 'nodes_traversed')
+
+        __slots__ = EVENTS + ('hooks',)
+
+        def __init__(self):
+            self.hooks = []
+            self.reset()
+
+        def record(self, event, count=1):
+            """Adds `count` to the counter for `event` and passes both on
+            to each hook.
+            :param event: One of `Stats.EVENTS`
+            :param count: The amount to add
+            """
+            setattr(self, event, getattr(self, event) + count)
+            for hook in self.hooks:
+                hook(event, count)
+
+        def reset(self):
+            """Sets every counter back to zero."""
+            for event in self.EVENTS:
+                setattr(self, event, 0)
+
+        def as_dict(self):
+            """Returns the counters as a dict keyed by event name."""
+            return dict((event, getattr(self, event)) for event in self.EVENTS)
+
+    class Cursor(object):
+        """ A position in an unrolled linked list, returned by
+            `UnrolledLinkedList.cursor`
+        """
+
+        __slots__ = ('ulist', 'index', 'node', 'offset', 'version')
+
+        def __init__(self, ulist, index):
+            """
+            :param ulist: The UnrolledLinkedList the cursor moves over
+            :param index: The starting position, from 0 up to and including
+                len(ulist) (just past the last item)
+            """
+            self.ulist = ulist
+            self.index = index
+            self.node, self.offset = ulist._locate(index)
+            self.version = ulist._version
+
+        def get(self):
+            """Returns the item under the cursor.
+            :raises IndexError: If the cursor is past the last item
+            """
+            self.__sync()
+            if self.node is None:
+                raise IndexError("Cursor is past the end of the list")
+            return self.node.data_list[self.offset]
+
+        def set(self, data):
+            """Replaces the item under the cursor.
+            :param data: The new value for the item
+            :raises IndexError: If the cursor is past the last item
+            """
+            self.__sync()
+            if self.node is None:
+                raise IndexError("Cursor is past the end of the list")
+            self.ulist._set_at(self.node, self.offset, data)
+
+        def next(self):
+            """Returns the item under the cursor and moves past it.
+            :raises IndexError: If the cursor is past the last item
+            """
+            data = self.get()
+            self.seek(1)
+            return data
+
+        def prev(self):
+            """Moves back one position and returns the item there.
+            :raises IndexError: If the cursor is at the first position
+            """
+            self.seek(-1)
+            return self.get()
+
+        def seek(self, delta):
+            """Moves the cursor `delta` positions (backwards if negative),
+            following node links rather than searching from the head.
+            :raises IndexError: If that would leave the list
+            """
+            self.__sync()
+            if not 0 <= self.index + delta <= len(self.ulist):
+                raise IndexError("Cursor out of bounds")
+            self.index += delta
+            node = self.node
+            offset = self.offset + delta
+            if node is None and delta < 0:
+                node = self.ulist.tail
+                offset += len(node.data_list)
+            while offset < 0:
+                node = node.prev_node
+                offset += len(node.data_list)
+            while node is not None and offset >= len(node.data_list):
+                offset -= len(node.data_list)
+                node = node.next_node
+            self.node = node
+            self.offset = offset
+
+        def insert_here(self, data):
+            """Inserts an item at the cursor and moves past it, so that
+            repeated calls insert items in order.
+            :param data: The item to insert
+            """
+            self.__sync()
+            self.node, self.offset = self.ulist._insert_at(
+                self.node, self.offset, self.index, data)
+            self.index += 1
+            self.version = self.ulist._version
+
+        def delete_here(self):
+            """Removes and returns the item under the cursor, which then
+            points at the item that followed it.
+            :raises IndexError: If the cursor is past the last item
+            """
+            self.__sync()
+            if self.node is None:
+                raise IndexError("Cursor is past the end of the list")
+            data, self.node, self.offset = self.ulist._delete_at(
+                self.node, self.offset, self.index)
+            self.version = self.ulist._version
+            return data
+
+        def __sync(self):
+            """Re-resolves the cursor's index if the list was changed
+            other than through this cursor. Appends only move items between
+            nodes when they split one, but they do fill in the end position.
+            """
+            if (self.version != self.ulist._version or
+                    self.node is None and self.index < len(self.ulist)):
+                self.index = min(self.index, len(self.ulist))
+                self.node, self.offset = self.ulist._locate(self.index)
+                self.version = self.ulist._version
+
+    def __init__(self, iterable=None, max_node_capacity=16, indexed=False,
+                 compact=False, typecode=None, adaptive=False,
+                 summaries=False, value_index=False):
         """  The constructor for the list.
 
         The default max node capacity is 16, but this value should be
         overridable.
 
+        Like `list`, the new list can be filled from an iterable, which is
+        packed straight into nodes (see `extend`). For backwards
+        compatibility an int first argument is taken as the max node
+        capacity, so both of these work:
+        `UnrolledLinkedList(8)` and
+        `UnrolledLinkedList(range(100), max_node_capacity=8)`
+
+        When `indexed` is True the list keeps an offset index over its node
+        chain (a tree of the nodes' item counts, see `OffsetIndex`) so that
+        positional lookups cost O(log nodes) instead of a walk from the head.
+        Edits keep the index current in O(log nodes) as well.
+
+        When `compact` is True each node's list is preallocated with room for
+        `max_node_capacity` items, so nodes never regrow (or over-allocate
+        past the capacity) as items are added to them. CPython keeps the
+        preallocation while a list is at least half-full, which balancing
+        guarantees for every node but the tail.
+
+        When `typecode` is given (e.g. 'd' or 'l') each node stores its items
+        in an `array.array` of that type instead of a list of boxed objects,
+        which takes a fraction of the memory for numeric data. Items must
+        then fit the typecode, as with `array.array`. Arrays are already
+        sized exactly, so `compact` has no effect on them. The setting is
+        kept as the `preallocate` attribute; `compact()` is a method that
+        repacks the list.
+
+        When `adaptive` is True `max_node_capacity` is only the starting
+        capacity. The list measures how far its lookups walk, how many items
+        its inserts and deletes shift and how many it appends, and every
+        1024 lookups, edits and appends picks the capacity that minimizes
+        that measured cost (a power of two from 4 to 4096). It re-chunks
+        itself to that capacity once the measured cost since the last
+        re-chunk is at least what re-chunking would cost, so re-chunking
+        never takes more than about half the time. `max_node_size` reports
+        the capacity in use.
+
+        When `summaries` is True membership tests (`in` and `index`) check
+        a small Bloom filter of each node's items before searching the node,
+        and skip the nodes that can't hold the item. Each summary is built
+        from the node's items the first time it is needed after items were
+        added to the node.
+
+        When `value_index` is True the list keeps a count of each value it
+        holds, updated as items are added and removed, so `in` and `count`
+        cost O(1) and `index` and `remove` fail fast on a missing value.
+        Items must then be hashable, as in a `set`.
+
         """
+        if isinstance(iterable, int):
+            iterable, max_node_capacity = None, iterable
+
         assert isinstance(max_node_capacity, int)
         assert max_node_capacity > 0
+        if typecode is not None:
+            array(typecode)  # raises for an unknown typecode
         self.max_node_capacity = max_node_capacity
         self.length = 0
         self.head = None
         self.tail = None
+        self.indexed = indexed
+        self.preallocate = compact
+        self.typecode = typecode
+        self.adaptive = adaptive
+        self._version = 0
+        self.__ops = 0
+        self.__walked = 0
+        self.__shifted = 0
+        self.__spent = 0.0
+        self.stats = None
+        self.summaries = summaries
+        self.value_index = value_index
+        self.__counts = Counter() if value_index else None
+        self.__finger = (None, 0, -1)
+        self.__offsets = self.OffsetIndex() if indexed else None
+
+        if iterable is not None:
+            self.extend(iterable)
 
     def __add__(self, other):
         """ Appends two Unrolled Linked Lists end-to-end using `+`
@@ -62,6 +554,9 @@ class UnrolledLinkedList(object):
             new_list = list_one + list_two
         `
 
+        Like `list`, the result is a shallow copy: the items themselves are
+        shared with the two source lists.
+
         Args:
             other: Another Unrolled Linked List object. The new ULL should have
                 the same max capacity as the current ULL.
@@ -79,16 +574,33 @@ class UnrolledLinkedList(object):
             raise TypeError("Can only add object of type UnrolledLinkedList")
 
         # Copy the current list and add the contents of other to it
-        new_list1 = deepcopy(self)
-        for x in other:
-            new_list1.append(x)
+        new_list = self.copy()
+        new_list.extend(other)
+        return new_list
+
+    def __iadd__(self, other):
+        """ Extends the list in place with another Unrolled Linked List using
+        `+=`
+
+        Usage: `my_list += other_list`
+
+        Raises:
+            TypeError: If `other` is not an unrolled linked list, as with `+`.
+        """
+        if not isinstance(other, UnrolledLinkedList):
+            raise TypeError("Can only add object of type UnrolledLinkedList")
 
-        return new_list1
+        self.extend(other)
+        return self
 
     def __mul__(self, count):
         """ Repeats (multiplies) the list a given number of times
 
-        Usage: `my_list *= 5` should return a list of itself repeated 5x
+        Usage: `my_list * 5` should return a list of itself repeated 5x
+
+        The items are flattened out of the nodes once and the repeated
+        sequence is packed straight into new nodes, as with `extend`. Like
+        `list`, the result is a shallow copy.
 
         Args:
             count: An integer indicating the number of times the list should
@@ -104,22 +616,26 @@ class UnrolledLinkedList(object):
         if not isinstance(count, int):
             raise TypeError("Count must be an int")
 
-        # If nothing is in the list mul won't do anything
-        if self.length == 0:
-            return self
+        # As with `list`, a count of 0 or less gives an empty list
+        return self.__new_list(chain.from_iterable(repeat(list(self), count)))
 
-        # Assuming that a list times 0 or less should return an empty list
-        if count <= 0:
-            return UnrolledLinkedList(self.max_node_capacity)
+    def __imul__(self, count):
+        """ Repeats the list in place a given number of times using `*=`
 
-        # Copy the initial list (self *= 1) then keep re-adding
-        # elements as determined by count.
-        new_list = deepcopy(self)
-        for i in range(count - 1):
-            for x in self:
-                new_list.append(x)
+        Usage: `my_list *= 5`
 
-        return new_list
+        Raises:
+            TypeError: If count is not an int
+        """
+        if not isinstance(count, int):
+            raise TypeError("Count must be an int")
+
+        if count <= 0:
+            self.clear()
+        else:
+            items = list(self)
+            self.extend(chain.from_iterable(repeat(items, count - 1)))
+        return self
 
     def __getitem__(self, index):
         """ Access the element at the given index.
@@ -152,19 +668,17 @@ class UnrolledLinkedList(object):
             IndexError: If the index is out of bounds.
 
         """
-        # If input is a slice then generate a new list by adding
-        # elements to it as determined by the slice attributes.
+        # If input is a slice then copy the covered parts of each node
+        # into a new list.
         if isinstance(index, slice):
-            new_list = UnrolledLinkedList(self.max_node_capacity)
-            for i in xrange(*index.indices(len(self))):
-                if i > -(len(self) + 1) or i < len(self):
-                    new_list.append(self[i])
-            return new_list
+            return self.__get_slice(index)
 
         self.__verify_index(index)
 
         if index < 0:
             index += self.length
+        if self.adaptive:
+            self.__tick()
 
         index, prev_node, cur_node = self.__find_node_index(index)
         return cur_node.data_list[index]
@@ -205,30 +719,30 @@ class UnrolledLinkedList(object):
                 in-place.
 
         Raises:
-            TypeError: If index is not an `int` object.
+            TypeError: If index is not an `int` object, or if a slice is
+                assigned anything but an unrolled linked list.
             IndexError: If the index is out of bounds.
+            ValueError: If an extended slice (step other than 1) is assigned
+                a list of a different length, as with `list`.
         """
         if isinstance(index, slice):
-            del self[index]
-            offset = 0
-            if len(self) == 0:
-                for x in value:
-                    self.append(x)
-            else:
-                for x in xrange(*index.indices(len(self))):
-                    self.__insert(x + offset, value)
-                    offset += value.length
-                    if not index.step:
-                        break
+            if not isinstance(value, UnrolledLinkedList):
+                raise TypeError("Can only set an UnrolledLinkedList in a "
+                                "slice")
+            if value is self:
+                value = self[:]
+            self.__set_slice(index, value)
             return
 
         self.__verify_index(index)
 
         if index < 0:
             index += self.length
+        if self.adaptive:
+            self.__tick()
 
         index, prev_node, cur_node = self.__find_node_index(index)
-        cur_node.data_list[index] = value
+        self._set_at(cur_node, index, value)
 
     def __delitem__(self, index):
         """ Deletes an item using the built-in `del` keyword
@@ -262,27 +776,30 @@ class UnrolledLinkedList(object):
             TypeError: If index is not an `int` object.
             IndexError: If the index is out of bounds.
         """
-        # If input is a slice then delete all elements as determined
-        # by the slice attributes, using an offset to account for the
-        # changing size of the list.
+        # If input is a slice then delete the covered parts of each node
+        # in one sweep.
         if isinstance(index, slice):
-            offset = 0
-            for i in xrange(*index.indices(len(self))):
-                if i > -(len(self) + 1) or i < len(self):
-                    del self[i - offset]
-                    offset += 1
+            self.__del_slice(index)
             return
 
         self.__verify_index(index)
 
         if index < 0:
             index += self.length
-
-        index, prev_node, cur_node = self.__find_node_index(index)
-        del cur_node.data_list[index]
+        if self.adaptive:
+            self.__tick()
+
+        node_index, prev_node, cur_node = self.__find_node_index(index)
+        if self.adaptive:
+            self.__shifted += len(cur_node.data_list) - node_index
+        if self.__counts is not None:
+            self.__uncount([cur_node.data_list[node_index]])
+        del cur_node.data_list[node_index]
         self.length -= 1
+        self.__index_resize(cur_node)
 
         self.__balance_node(prev_node, cur_node)
+        self.__invalidate()
 
     def __iter__(self):
         """ Returns an iterable to allow one to iterate the list.
@@ -316,6 +833,21 @@ class UnrolledLinkedList(object):
             True: if `item` is found somewhere in the list
             False: if `item` is not found anywhere in the list
         """
+        if self.__counts is not None:
+            return self.count(item) > 0
+
+        bits = self.__summary_bits(item) if self.summaries else None
+        if bits is not None:
+            cur_node = self.head
+            while cur_node is not None:
+                summary = cur_node.summary
+                if summary is None:
+                    summary = cur_node.summary = self.__summarize(cur_node)
+                if summary & bits == bits and item in cur_node.data_list:
+                    return True
+                cur_node = cur_node.next_node
+            return False
+
         cur_node = self.head
         while cur_node is not None:
             if item in cur_node.data_list:
@@ -325,6 +857,88 @@ class UnrolledLinkedList(object):
 
         return False
 
+    def index(self, item, start=0, stop=None):
+        """ Returns the position of the first object equal to `item`.
+
+        With `summaries` on, nodes whose summary rules the item out are
+        skipped without being searched.
+
+        Usage: `my_list.index(4)`
+
+        Args:
+            item: The object to look for.
+            start: Where to start searching, as with `list.index`.
+            stop: Where to stop searching, as with `list.index`.
+
+        Raises:
+            ValueError: If `item` is not in the searched part of the list.
+        """
+        start, stop, step = slice(start, stop).indices(self.length)
+        bits = None
+        if self.summaries:
+            bits = self.__summary_bits(item)
+
+        cur_index = 0
+        cur_node = None
+        if self.__counts is not None and not self.count(item):
+            pass  # the value index rules it out
+        elif start == 0:
+            cur_node = self.head
+        elif start < stop:
+            offset, prev_node, cur_node = self.__find_node_index(start)
+            cur_index = start - offset
+        while cur_node is not None and cur_index < stop:
+            size = len(cur_node.data_list)
+            if bits is not None:
+                summary = cur_node.summary
+                if summary is None:
+                    summary = cur_node.summary = self.__summarize(cur_node)
+                if summary & bits != bits:
+                    cur_index += size
+                    cur_node = cur_node.next_node
+                    continue
+            # Only the searched part of an end node is looked at; arrays
+            # have no bounded `index`, so that part is sliced out
+            begin = max(start - cur_index, 0)
+            end = min(stop - cur_index, size)
+            data_list = cur_node.data_list
+            if begin > 0 or end < size:
+                data_list = data_list[begin:end]
+            if item in data_list:
+                return cur_index + begin + data_list.index(item)
+            cur_index += size
+            cur_node = cur_node.next_node
+
+        raise ValueError("%r is not in list" % (item,))
+
+    def count(self, item):
+        """ Returns the number of objects equal to `item`, looked up in
+        the value index if the list has one.
+
+        Usage: `my_list.count(4)`
+        """
+        if self.__counts is not None:
+            try:
+                return self.__counts.get(item, 0)
+            except TypeError:
+                return 0  # unhashable, so it can't have been added
+        total = 0
+        cur_node = self.head
+        while cur_node is not None:
+            total += cur_node.data_list.count(item)
+            cur_node = cur_node.next_node
+        return total
+
+    def remove(self, item):
+        """ Removes the first object equal to `item`.
+
+        Usage: `my_list.remove(4)`
+
+        Raises:
+            ValueError: If `item` is not in the list.
+        """
+        del self[self.index(item)]
+
     def append(self, data):
         """ Add a new object to the end of the list.
 
@@ -349,183 +963,2482 @@ class UnrolledLinkedList(object):
             nothing
 
         """
+        if self.adaptive:
+            self.__tick()
+            self.__walked += 1
+        if self.__counts is not None:
+            self.__count([data])
+
         # If list is empty, create a new node
         if self.length == 0:
-            self.head = self.Node([data], None)
+            self.head = self._new_node(self.__node_list([data]), None)
             self.tail = self.head
+            self.__index_link(self.head)
         # Otherwise add to the end of the tail. If the tail
         # becomes unbalanced (grows beyond max_node_capacity)
         # then split it, creating a new tail.
         else:
             self.tail.append(data)
+            if self.__offsets is not None:
+                self.__offsets.resize(self.tail, len(self.tail.data_list))
             if len(self.tail.data_list) > self.max_node_capacity:
                 self.__split_node(self.tail)
 
         self.length += 1
 
-    def __reversed__(self):
-        """ Works just like __iter__, but starts from the back.
+    def extend(self, iterable):
+        """ Add every object from `iterable` to the end of the list.
 
-        Usage: `for i in reversed(my_list)`
+        Rather than appending one item at a time (and splitting the tail every
+        `max_node_capacity` items), the input is sliced straight into nodes:
+        the tail is topped up and then full nodes are linked on behind it. If
+        the last node ends up less than half-full it is evened out with the
+        one before it, so every node stays at least half-full.
+
+        Usage: `my_list.extend(range(10))`
+
+        Args:
+            iterable: Any iterable of objects to be added to the list
 
         Returns:
-            An iterator starting from the back of the list
+            nothing
+
         """
-        if len(self) == 0:
-            return
+        if iterable is self:
+            iterable = list(self)
+        if self.typecode is not None:
+            iterable = self.__typed(iterable)
+        if self.adaptive:
+            self.__tick()
+        length = self.length
+        it = iter(iterable)
+        capacity = self.max_node_capacity
 
-        # Create a list containing pointers to each
-        # prev_node in the list.
-        cur_node = self.head
-        prev_nodes = [None]
-        while cur_node != self.tail:
-            prev_nodes.append(cur_node)
-            cur_node = cur_node.next_node
+        prev_node = None
+        if self.tail is not None:
+            chunk = list(islice(it, capacity - len(self.tail.data_list)))
+            if self.__counts is not None:
+                self.__count(chunk)
+            self.tail.data_list.extend(chunk)
+            self.tail.summary = None
+            self.length += len(chunk)
+            self.__index_resize(self.tail)
+
+        while True:
+            chunk = list(islice(it, capacity))
+            if not chunk:
+                break
+            prev_node = self.tail
+            self.__link_node(chunk)
 
-        # Using the prev_nodes list, iterate backwards
-        while cur_node is not None:
-            for x in reversed(cur_node.data_list):
-                yield x
-            cur_node = prev_nodes[-1]
-            del prev_nodes[-1]
+        # Even out a short tail with the full node packed before it
+        if prev_node is not None:
+            self.__even_tail()
+        if self.adaptive:
+            self.__walked += self.length - length
 
-    def __str__(self):
-        """ Returns a string representation of the list.
+    def appendleft(self, data):
+        """ Add a new object to the front of the list.
 
-        The format for representing an unrolled linked list will be as follows:
-            - curly braces indicates an unrolled linked list
-            - square brackets indicates a node
-            - all values are separated by a comma and a space
-        For example:
-        {[1, 2, 3], [0, 9, 8], [2, 4, 6]}
-        This list has three nodes and each node as three int objects in it.
+        The head node takes the object, and is split like the tail in
+        `append` if that takes it over capacity.
 
-        Usage: `str(my_list)`
+        Usage: `my_list.appendleft(4)`
 
-        Returns:
-            A string representation of the list.
-        """
-        cur_node = self.head
-        str_list = ['{']
-        while cur_node is not None:
-            str_list.append(str(cur_node))
-            if cur_node is not self.tail:
-                str_list.append(', ')
-            cur_node = cur_node.next_node
-        str_list.append('}')
-        return ''.join(str_list)
+        Args:
+            data: The new object to be added to the list
 
-    def __verify_index(self, index):
-        """Verifies that the given index is an int and is not out of bounds. If
-        the index is valid then return True.
         """
-        if not isinstance(index, int):
-            raise TypeError("Index must be of type int")
-        elif index >= self.length or index < -self.length:
-            raise IndexError("Index out of bounds")
-        return True
+        if self.length == 0:
+            self.append(data)
+            return
+        if self.adaptive:
+            self.__tick()
+            self.__shifted += len(self.head.data_list)
+        if self.__counts is not None:
+            self.__count([data])
+
+        self.head.data_list.insert(0, data)
+        self.head.summary = None
+        self.__index_resize(self.head)
+        if len(self.head.data_list) > self.max_node_capacity:
+            self.__split_node(self.head)
+        self.length += 1
+        self.__invalidate()
+
+    def extendleft(self, iterable):
+        """ Add every object from `iterable` to the front of the list.
+
+        As with `collections.deque`, the objects end up in reverse order. They
+        are packed into new nodes linked in before the head, and only the seam
+        with the old head is balanced.
+
+        Usage: `my_list.extendleft(range(10))`
+
+        Args:
+            iterable: Any iterable of objects to be added to the list
 
-    def __find_node_index(self, index):
-        """Finds the node and node list index that corresponds to the
-        given index as well as the indexed node's previous node.
         """
-        cur_index = 0
-        cur_node = self.head
-        prev_node = None
-        while cur_node is not None:
-            if index >= len(cur_node.data_list) + cur_index:
-                cur_index += len(cur_node.data_list)
-                prev_node = cur_node
-                cur_node = cur_node.next_node
-            else:
-                index -= cur_index
-                break
-        return index, prev_node, cur_node
+        items = list(iterable)
+        if self.typecode is not None:
+            items = self.__typed(items)
+        items.reverse()
+        if not items or self.length == 0:
+            self.extend(items)
+            return
 
-    def __insert(self, index, value):
+        # Pack the items into a chain of this list's own nodes, linked on
+        # while the list is detached, then join the old nodes on behind it
+        head, tail, length = self.head, self.tail, self.length
+        self.head = None
+        self.tail = None
+        self.length = 0
+        capacity = self.max_node_capacity
+        for i in xrange(0, len(items), capacity):
+            self.__link_node(items[i:i + capacity])
+        self.length += length
+        self.__invalidate()
+
+        front_tail = self.tail
+        front_tail.next_node = head
+        head.prev_node = front_tail
+        self.tail = tail
+        self.__fill_nodes(front_tail.prev_node, [front_tail, head])
+
+    def pop(self, index=-1):
+        """ Remove and return the object at `index` (default last).
+
+        Both ends are found without a walk from the head, so popping from
+        either end costs O(1) amortized.
+
+        Usage: `my_list.pop()`
+
+        Args:
+            index: An int value indicating an index in the list.
+
+        Returns:
+            The object that was removed.
+
+        Raises:
+            IndexError: If the list is empty or the index is out of bounds.
         """
+        if self.length == 0:
+            raise IndexError("pop from empty list")
+        data = self[index]
+        del self[index]
+        return data
+
+    def popleft(self):
+        """ Remove and return the first object in the list.
+
+        Usage: `my_list.popleft()`
+
+        Raises:
+            IndexError: If the list is empty.
         """
-        if not isinstance(value, UnrolledLinkedList):
-            raise TypeError("Can only set an UnrolledLinkedList in a slice")
+        return self.pop(0)
 
-        if len(self) == 0:
-            for x in value:
-                self.append(x)
-            return
+    def iter_chunks(self):
+        """ Yields the items of each node in turn, as a slice of the node's
+        storage: a list, or in typed mode an array.
 
-        index, prev_node, cur_node = self.__find_node_index(index)
-        for i, x in enumerate(value):
-            cur_node.data_list.insert(index + i, x)
+        Consumers that work in batches, such as `csv.writer.writerows` or
+        `hashlib` digests, can take a node at a time instead of a Python
+        step per item. Each slice is a copy, so changing it doesn't change
+        the list.
+
+        Usage: `
+            for chunk in my_list.iter_chunks():
+                digest.update(chunk)
+        `
+        """
+        cur_node = self.head
+        while cur_node is not None:
+            yield cur_node.data_list[:]
+            cur_node = cur_node.next_node
 
-        self.length += value.length
-        self.__balance_list()
+    def iter_chunks_reversed(self):
+        """ Works just like `iter_chunks`, but starts from the back. The
+        items within each chunk keep their order.
 
-    def __split_node(self, cur_node):
-        """Creates a new node and splits the current contents of data_list evenly
-        among them. The current node will point to the new node and the new node
-        will point to the initial next_node
+        Usage: `for chunk in my_list.iter_chunks_reversed():`
         """
-        temp = self.Node(cur_node.data_list[len(cur_node.data_list) / 2:], cur_node.next_node)
-        cur_node.data_list = cur_node.data_list[:len(cur_node.data_list) / 2]
-        cur_node.next_node = temp
+        cur_node = self.tail
+        while cur_node is not None:
+            yield cur_node.data_list[:]
+            cur_node = cur_node.prev_node
 
-        if cur_node == self.tail:
-            self.tail = cur_node.next_node
+    def chunks(self, start=0, stop=None):
+        """ Works like `iter_chunks` over the items from `start` up to
+        `stop`, as `my_list[start:stop]` would select them. The first and
+        last chunks hold just the part of their node in the range.
 
-    def __balance_node(self, prev_node, cur_node):
-        """Balances a node that has its list less than half-full.
+        Usage: `for chunk in my_list.chunks(1000, 2000):`
+
+        Args:
+            start: The index of the first item, which may be negative.
+            stop: The index after the last item, by default the end.
         """
-        if len(cur_node.data_list) >= self.max_node_capacity / 2:
+        start, stop, step = slice(start, stop).indices(self.length)
+        if start >= stop:
             return
 
-        # node is empty?
-        if not cur_node.data_list:
-            self.__del_node(prev_node, cur_node)
+        cur_node, offset = self._locate(start)
+        remaining = stop - start
+        while cur_node is not None and remaining > 0:
+            chunk = cur_node.data_list[offset:offset + remaining]
+            remaining -= len(chunk)
+            yield chunk
+            offset = 0
+            cur_node = cur_node.next_node
 
-        # node is not tail?
-        elif cur_node != self.tail:
-            if len(cur_node.next_node.data_list) - 1 < self.max_node_capacity / 2:
-                cur_node.data_list += cur_node.next_node.data_list
-                self.__del_node(cur_node, cur_node.next_node)
-            else:
-                cur_node.data_list.append(cur_node.next_node.data_list[0])
-                del cur_node.next_node.data_list[0]
-        elif len(cur_node.data_list) < self.max_node_capacity and prev_node is not None:
-            prev_node.data_list.append(cur_node.data_list[0])
-            del cur_node.data_list[0]
-            self.__del_node(prev_node, cur_node)
+    def writelines(self, fp):
+        """ Writes the items to the file-like object `fp` a node at a time.
 
-    def __del_node(self, prev_node, cur_node):
-        """Deletes the given node by pointing the previous node to the
-        current node's next node
-        """
-        if len(self) == 0:
-            self.head = None
-            self.tail = None
-        elif prev_node is None:
-            self.head = cur_node.next_node
-        else:
-            prev_node.next_node = cur_node.next_node
-            if cur_node == self.tail:
-                self.tail = prev_node
+        Like `file.writelines`, the items of an untyped list must be
+        strings, and are written as they are. A typed list writes its items'
+        machine values, as `array.tofile` does.
 
-    def __balance_list(self):
-        """Balances the given UnrolledLinkedList by iterating over each node,
-        balancing/splitting as necessary.
+        Usage: `
+            with open('lines.txt', 'w') as fp:
+                my_list.writelines(fp)
+        `
         """
         cur_node = self.head
-        prev_node = None
-
         while cur_node is not None:
-            if len(cur_node.data_list) > self.max_node_capacity:
-                while len(cur_node.data_list) > self.max_node_capacity:
-                    self.__split_node(cur_node)
-            elif len(cur_node.data_list) < self.max_node_capacity / 2:
-                self.__balance_node(prev_node, cur_node)
-            prev_node = cur_node
+            if self.typecode is not None:
+                fp.write(cur_node.data_list.tostring())
+            else:
+                fp.writelines(cur_node.data_list)
             cur_node = cur_node.next_node
 
-    @property
-    def max_node_size(self):
-        """Returns the specified max capacity for each node"""
-        return self.max_node_capacity
+    def aextend(self, iterable, max_length=None):
+        """ Extends the list from `iterable` one node's worth of items at a
+        time, as a generator that yields between nodes.
+
+        Each step takes up to `max_node_capacity` items from `iterable` and
+        packs them into the list as with `extend`, so an event loop or
+        scheduler driving the generator gets control back at least once per
+        node instead of once per `extend`. With `max_length`, a step that
+        finds the list that long takes nothing and yields 0; the driver
+        should run consumers (such as `aiter_chunks(consume=True)`) to make
+        room before resuming it.
+
+        Usage: `
+            ingest = buffer.aextend(records, max_length=10000)
+            for added in ingest:
+                if not added:
+                    send(next(batches))
+        `
+
+        Args:
+            iterable: The items to add.
+            max_length: The longest the list may grow to, if limited.
+
+        Yields:
+            The number of items added by each step, or 0 while the list is
+            full.
+        """
+        items = iter(iterable)
+        while True:
+            room = self.max_node_capacity
+            if max_length is not None:
+                room = min(room, max_length - self.length)
+                if room <= 0:
+                    yield 0
+                    continue
+            batch = list(islice(items, room))
+            if not batch:
+                return
+            self.extend(batch)
+            yield len(batch)
+
+    def aiter_chunks(self, consume=False):
+        """ Yields the items of each node in turn, as a new list, so that a
+        scheduler driving the generator gets control back between nodes.
+
+        The list may change between steps; as with `__iter__`, items moved
+        between nodes meanwhile may be skipped or seen twice. With `consume`
+        each node's items are removed from the front of the list as they are
+        yielded, which makes the list a buffer for `aextend` to refill.
+
+        Usage: `
+            for batch in buffer.aiter_chunks(consume=True):
+                send(batch)
+        `
+
+        Args:
+            consume: Remove the items yielded.
+
+        Yields:
+            Lists of up to `max_node_capacity` items, until the list ends (or
+            with `consume`, until it is empty).
+        """
+        if consume:
+            while True:
+                data = self._take_head()
+                if not data:
+                    return
+                yield data
+
+        cur_node = self.head
+        while cur_node is not None:
+            yield list(cur_node.data_list)
+            cur_node = cur_node.next_node
+
+    def cursor(self, index=0):
+        """ Returns a cursor positioned at `index`.
+
+        A cursor holds its position as a node and an offset into it, so
+        moving it and editing at it cost O(1) amortized instead of a search
+        from the head per access. Splits and merges made through the cursor
+        keep it in place; after any other change to the list it finds its
+        index again on next use.
+
+        Usage: `
+            cursor = my_list.cursor(10)
+            cursor.insert_here('x')
+            cursor.seek(-2)
+            cursor.delete_here()
+        `
+
+        Args:
+            index: A position from 0 up to and including `len(my_list)`,
+                which is just past the last item.
+
+        Returns:
+            An `UnrolledLinkedList.Cursor`.
+
+        Raises:
+            TypeError: If index is not an `int` object.
+            IndexError: If the index is out of bounds.
+        """
+        if not isinstance(index, int):
+            raise TypeError("Index must be of type int")
+        if not 0 <= index <= self.length:
+            raise IndexError("Index out of bounds")
+        return self.Cursor(self, index)
+
+    def clear(self):
+        """ Removes every object from the list.
+
+        Usage: `my_list.clear()`
+        """
+        self.head = None
+        self.tail = None
+        self.length = 0
+        if self.__counts is not None:
+            self.__counts.clear()
+        if self.__offsets is not None:
+            self.__offsets.clear()
+        self.__invalidate()
+
+    def copy(self):
+        """ Returns a shallow copy of the list.
+
+        The nodes are cloned one at a time, so the copy has the same node
+        layout as the original while the items themselves are shared.
+
+        Usage: `new_list = my_list.copy()` or `copy.copy(my_list)`
+
+        Returns:
+            A new unrolled linked list.
+        """
+        new_list = self.__new_list()
+        cur_node = self.head
+        while cur_node is not None:
+            new_list.__link_node(cur_node.data_list[:])
+            cur_node = cur_node.next_node
+        return new_list
+
+    __copy__ = copy
+
+    def __getstate__(self):
+        """ Returns the list's settings and the item lists of its nodes, so
+        that `pickle` and `copy.deepcopy` store a flat list of node lists
+        instead of recursing down the chain of node links. Stats are not
+        kept.
+        """
+        data_lists = []
+        cur_node = self.head
+        while cur_node is not None:
+            data_lists.append(cur_node.data_list)
+            cur_node = cur_node.next_node
+        return {'settings': self.__settings(), 'data_lists': data_lists}
+
+    def __setstate__(self, state):
+        """ Rebuilds the list from `__getstate__`'s state. """
+        UnrolledLinkedList.__init__(self, **state['settings'])
+        for data_list in state['data_lists']:
+            self.__link_node(data_list)
+
+    def dump(self, fp):
+        """ Writes the list to the binary file `fp`.
+
+        Each node is written as a page: typed nodes as their raw item bytes
+        padded to `max_node_capacity` items, so every page is the same size,
+        and other nodes as a pickled list. A directory of the pages follows
+        them, so `load` can find any node without reading the ones before
+        it.
+
+        Usage: `
+            with open('my_list.ull', 'wb') as fp:
+                my_list.dump(fp)
+        `
+        """
+        settings = self.__settings()
+        flags = 0
+        for bit, name in enumerate(FILE_FLAGS):
+            if settings[name]:
+                flags |= 1 << bit
+        fp.write(pack(FILE_HEADER, FILE_MAGIC, flags, self.typecode or '\0',
+                      self.max_node_capacity, self.length))
+
+        offset = calcsize(FILE_HEADER)
+        directory = []
+        cur_node = self.head
+        while cur_node is not None:
+            if self.typecode is None:
+                page = dumps(list(cur_node.data_list), 2)
+            else:
+                page = cur_node.data_list.tostring()
+                page += '\0' * (self.max_node_capacity *
+                                cur_node.data_list.itemsize - len(page))
+            fp.write(page)
+            directory.append(pack(FILE_ENTRY, offset, len(page),
+                                  len(cur_node.data_list)))
+            offset += len(page)
+            cur_node = cur_node.next_node
+
+        fp.write(''.join(directory))
+        fp.write(pack(FILE_TRAILER, offset, len(directory)))
+
+    @classmethod
+    def load(cls, fp, lazy=False):
+        """ Reads a list written by `dump` from the binary file `fp`.
+
+        With `lazy` the file is memory-mapped instead of read, and each
+        node's page is only read in when its items are first used, by
+        iteration or by a lookup that lands on it. The list is then
+        `indexed` with its offset index taken from the page directory, so
+        lookups go straight to the page they need. A list with a
+        `value_index` needs every item to build it and is read in full.
+
+        Like `pickle`, pages of untyped lists are unpickled, so only load
+        files you trust.
+
+        Usage: `
+            with open('my_list.ull', 'rb') as fp:
+                my_list = UnrolledLinkedList.load(fp, lazy=True)
+        `
+
+        Raises:
+            ValueError: If `fp` doesn't hold a dumped list.
+        """
+        if lazy:
+            buf = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            buf = fp.read()
+        if buf[:len(FILE_MAGIC)] != FILE_MAGIC:
+            raise ValueError("Not a dumped UnrolledLinkedList")
+
+        magic, flags, typecode, capacity, length = unpack_from(FILE_HEADER,
+                                                               buf)
+        settings = dict((name, bool(flags & 1 << bit))
+                        for bit, name in enumerate(FILE_FLAGS))
+        settings['max_node_capacity'] = capacity
+        settings['typecode'] = None if typecode == '\0' else typecode
+        lazy = lazy and not settings['value_index']
+        if lazy:
+            settings['indexed'] = True
+
+        ulist = cls.__new__(cls)
+        ulist.__setstate__({'settings': settings, 'data_lists': []})
+        directory, count = unpack_from(FILE_TRAILER, buf,
+                                       len(buf) - calcsize(FILE_TRAILER))
+        entry_size = calcsize(FILE_ENTRY)
+        for i in xrange(count):
+            offset, size, items = unpack_from(FILE_ENTRY, buf,
+                                              directory + i * entry_size)
+            if typecode != '\0':
+                size = items * array(typecode).itemsize
+            page = (buf, offset, size, settings['typecode'])
+            if lazy:
+                ulist.__link_page(page, items)
+            else:
+                ulist.__link_node(cls.PagedNode(page).data_list)
+        return ulist
+
+    def sum(self):
+        """ Returns the sum of the items in the list.
+
+        Each node is summed as a whole: typed nodes as a NumPy array when
+        NumPy is installed, others with the builtin `sum`, so untyped
+        integers never overflow a fixed-width accumulator.
+
+        Usage: `my_list.sum()`
+        """
+        if self.__vectorized():
+            return sum(data_list.sum().item()
+                       for data_list in self.__iter_node_data())
+        return sum(sum(data_list) for data_list in self.__iter_node_data())
+
+    def min(self):
+        """ Returns the smallest item in the list, taken node by node.
+
+        Raises:
+            ValueError: If the list is empty.
+        """
+        if self.__vectorized():
+            return min(data_list.min().item()
+                       for data_list in self.__iter_node_data())
+        return min(min(data_list) for data_list in self.__iter_node_data())
+
+    def max(self):
+        """ Returns the largest item in the list, taken node by node.
+
+        Raises:
+            ValueError: If the list is empty.
+        """
+        if self.__vectorized():
+            return max(data_list.max().item()
+                       for data_list in self.__iter_node_data())
+        return max(max(data_list) for data_list in self.__iter_node_data())
+
+    def mean(self):
+        """ Returns the arithmetic mean of the items in the list.
+
+        Raises:
+            ValueError: If the list is empty.
+        """
+        if self.length == 0:
+            raise ValueError("mean of an empty list")
+        return self.sum() / float(self.length)
+
+    def argmax(self):
+        """ Returns the index of the (first) largest item in the list.
+
+        Raises:
+            ValueError: If the list is empty.
+        """
+        vectorized = self.__vectorized()
+        best_index = -1
+        best = None
+        start = 0
+        for data_list in self.__iter_node_data():
+            if vectorized:
+                index = int(data_list.argmax())
+            else:
+                index = max(xrange(len(data_list)), key=data_list.__getitem__)
+            if best_index < 0 or data_list[index] > best:
+                best_index = start + index
+                best = data_list[index]
+            start += len(data_list)
+
+        if best_index < 0:
+            raise ValueError("argmax of an empty list")
+        return best_index
+
+    def to_numpy(self):
+        """ Returns the items of the list as one NumPy array.
+
+        Raises:
+            ImportError: If NumPy is not installed.
+        """
+        if numpy is None:
+            raise ImportError("to_numpy requires NumPy")
+        if self.length == 0:
+            return numpy.array([], dtype=self.typecode)
+        return numpy.concatenate(list(self.__iter_node_data()))
+
+    def filter(self, mask_fn):
+        """ Returns a new list of the items selected by `mask_fn`.
+
+        `mask_fn` is called once per node with the node's items as stored
+        (a list, or an array for a typed list, whether or not NumPy is
+        installed) and returns a sequence of booleans of the same length,
+        e.g. `my_list.filter(lambda items: [x > 0 for x in items])`. The
+        selected items are packed into the new list as with `extend`;
+        typed nodes are selected with NumPy when it is installed.
+
+        Args:
+            mask_fn: A function mapping a node's items to a boolean mask.
+
+        Returns:
+            A new unrolled linked list.
+        """
+        vectorized = self.__vectorized()
+        new_list = self.__new_list()
+        cur_node = self.head
+        while cur_node is not None:
+            data_list = cur_node.data_list
+            mask = mask_fn(data_list)
+            if vectorized:
+                data_list = numpy.frombuffer(data_list, self.typecode)
+                new_list.extend(data_list[numpy.asarray(mask, bool)].tolist())
+            else:
+                new_list.extend(compress(data_list, mask))
+            cur_node = cur_node.next_node
+        return new_list
+
+    def parallel_map(self, fn, workers=None, threads=False, pool=None):
+        """ Returns a new list of `fn(item)` for each item, computed on a
+        pool of workers.
+
+        The nodes are split into runs of whole nodes, a few per worker, and
+        each run is sent to a worker as its nodes' item lists. The results
+        come back in node order and are packed into the new list as with
+        `extend`. `fn` may return items of any type, so the new list keeps
+        only this list's node capacity, not its other settings. A process
+        pool pickles `fn`, the items and the results, so `fn` has to be a
+        module-level function; it pays off when `fn` costs much more than
+        pickling an item.
+
+        Usage: `my_list.parallel_map(math.sqrt, workers=4)`
+
+        Args:
+            fn: A function of one item.
+            workers: How many workers to start, by default one per CPU.
+            threads: Use a thread pool instead of a process pool.
+            pool: A `multiprocessing` `Pool` or `ThreadPool` to use instead
+                of starting one. It is left open.
+
+        Returns:
+            A new unrolled linked list.
+        """
+        return UnrolledLinkedList(
+            chain.from_iterable(
+                self.__parallel(_map_run, fn, workers, threads, pool)),
+            max_node_capacity=self.max_node_capacity)
+
+    def parallel_filter(self, fn, workers=None, threads=False, pool=None):
+        """ Returns a new list of the items for which `fn(item)` is true,
+        tested on a pool of workers as in `parallel_map`.
+
+        Usage: `my_list.parallel_filter(is_prime, workers=4)`
+        """
+        return self.__new_list(chain.from_iterable(
+            self.__parallel(_filter_run, fn, workers, threads, pool)))
+
+    def parallel_reduce(self, fn, initial=None, workers=None, threads=False,
+                        pool=None):
+        """ Reduces the items with `fn` as `reduce` does, on a pool of
+        workers as in `parallel_map`.
+
+        Each worker reduces its runs of nodes, and then their results are
+        reduced in node order, so `fn` has to be associative, like `+` or
+        `max`. `initial` is applied once, before the first result.
+
+        Usage: `my_list.parallel_reduce(operator.add, 0)`
+
+        Raises:
+            TypeError: If the list is empty and no `initial` is given.
+        """
+        results = self.__parallel(_reduce_run, fn, workers, threads, pool)
+        if initial is None:
+            return reduce(fn, results)
+        return reduce(fn, results, initial)
+
+    def compact(self, fill=1.0):
+        """ Repacks the list into the fewest nodes in one pass.
+
+        Deletes leave nodes anywhere from half to completely full, so a list
+        that has shrunk can hold up to twice the nodes it needs. This packs
+        `fill * max_node_capacity` items into every node but the last, which
+        leaves room for that many inserts per node before any splits.
+
+        Usage: `my_list.compact()` or `my_list.compact(0.75)`
+
+        Args:
+            fill: How full to pack each node, from 0.5 to 1.0.
+
+        Raises:
+            ValueError: If fill is out of range.
+        """
+        if not 0.5 <= fill <= 1.0:
+            raise ValueError("fill must be from 0.5 to 1.0")
+        self.__repack(max(int(self.max_node_capacity * fill), 1))
+
+    def memory_usage(self):
+        """ Reports the memory the list takes, split between its node
+        structure and the items held in it.
+
+        Typed nodes store their items inline, so their payload is the item
+        bytes and only the rest of each array counts as structure. Items
+        held in more than one position (or list) are counted each time.
+
+        Usage: `my_list.memory_usage()['fill_ratio']`
+
+        Returns:
+            A dict holding the `nodes` and `items` counts, the `fill_ratio`
+            of items to node capacity, and `node_bytes` and `payload_bytes`.
+        """
+        nodes = 0
+        cur_node = self.head
+        while cur_node is not None:
+            nodes += 1
+            cur_node = cur_node.next_node
+
+        if self.typecode is not None:
+            payload_bytes = array(self.typecode).itemsize * self.length
+        else:
+            payload_bytes = sum(getsizeof(item) for item in self)
+        fill_ratio = 0.0
+        if nodes:
+            fill_ratio = float(self.length) / (nodes * self.max_node_capacity)
+        node_bytes = getsizeof(self)
+        if self.typecode is not None:
+            node_bytes -= payload_bytes
+        return {'nodes': nodes, 'items': self.length,
+                'fill_ratio': fill_ratio, 'node_bytes': node_bytes,
+                'payload_bytes': payload_bytes}
+
+    def enable_stats(self, hook=None):
+        """ Starts counting the structural work the list does.
+
+        The counters are kept on the returned `UnrolledLinkedList.Stats`:
+        node splits, merges of one node into another, borrows of items from
+        the next node, nodes unlinked from the chain, fill passes over the
+        nodes around an insert or slice edit, positional lookups, and the
+        nodes those lookups stepped across. Until this is called (and after
+        `disable_stats`) none of this is counted.
+
+        Usage: `
+            stats = my_list.enable_stats(lambda event, count: ...)
+            ...
+            print stats.as_dict()
+        `
+
+        Args:
+            hook: An optional callable, called as `hook(event, count)` each
+                time a counter is added to. More hooks can be appended to
+                `stats.hooks`.
+
+        Returns:
+            The list's `UnrolledLinkedList.Stats`, kept if already enabled.
+        """
+        if self.stats is None:
+            self.stats = self.Stats()
+        if hook is not None:
+            self.stats.hooks.append(hook)
+        return self.stats
+
+    def disable_stats(self):
+        """ Stops counting and returns the final stats, or None if they
+        were not enabled.
+        """
+        stats = self.stats
+        self.stats = None
+        return stats
+
+    def fill_histogram(self, bins=10):
+        """ Returns how full the nodes are, as a count of nodes per bin.
+
+        Bin i counts the nodes holding from i / bins up to (i + 1) / bins of
+        `max_node_capacity` items; full nodes are counted in the last bin.
+
+        Usage: `my_list.fill_histogram(4)`
+
+        Args:
+            bins: The number of bins to split the fill ratio into.
+
+        Returns:
+            A list of `bins` ints.
+        """
+        histogram = [0] * bins
+        cur_node = self.head
+        while cur_node is not None:
+            fill = len(cur_node.data_list) * bins / self.max_node_capacity
+            histogram[min(fill, bins - 1)] += 1
+            cur_node = cur_node.next_node
+        return histogram
+
+    def __reversed__(self):
+        """ Works just like __iter__, but starts from the back.
+
+        Usage: `for i in reversed(my_list)`
+
+        Returns:
+            An iterator starting from the back of the list
+        """
+        cur_node = self.tail
+        while cur_node is not None:
+            for x in reversed(cur_node.data_list):
+                yield x
+            cur_node = cur_node.prev_node
+
+    def __sizeof__(self):
+        """ Returns the size of the list in bytes, counting its nodes and
+        their lists but not the items they hold, like `list.__sizeof__`.
+
+        Usage: `sys.getsizeof(my_list)`
+        """
+        size = object.__sizeof__(self)
+        if self.__offsets is not None:
+            size += getsizeof(self.__offsets)
+        cur_node = self.head
+        while cur_node is not None:
+            size += getsizeof(cur_node) + getsizeof(cur_node.data_list)
+            cur_node = cur_node.next_node
+        return size
+
+    def __str__(self):
+        """ Returns a string representation of the list.
+
+        The format for representing an unrolled linked list will be as follows:
+            - curly braces indicates an unrolled linked list
+            - square brackets indicates a node
+            - all values are separated by a comma and a space
+        For example:
+        {[1, 2, 3], [0, 9, 8], [2, 4, 6]}
+        This list has three nodes and each node as three int objects in it.
+
+        Usage: `str(my_list)`
+
+        Returns:
+            A string representation of the list.
+        """
+        cur_node = self.head
+        str_list = ['{']
+        while cur_node is not None:
+            str_list.append(str(cur_node))
+            if cur_node is not self.tail:
+                str_list.append(', ')
+            cur_node = cur_node.next_node
+        str_list.append('}')
+        return ''.join(str_list)
+
+    def __new_list(self, iterable=None):
+        """Creates a new list with the same settings as this one, optionally
+        filled from `iterable`.
+        """
+        return UnrolledLinkedList(iterable, **self.__settings())
+
+    def __settings(self):
+        """Returns the constructor arguments that give this list's
+        settings.
+        """
+        return {'max_node_capacity': self.max_node_capacity,
+                'indexed': self.indexed, 'compact': self.preallocate,
+                'typecode': self.typecode, 'adaptive': self.adaptive,
+                'summaries': self.summaries, 'value_index': self.value_index}
+
+    def __parallel(self, worker, fn, workers, threads, pool):
+        """Runs `worker(fn, data_lists)` on runs of whole nodes on a pool
+        and returns the results in node order.
+        """
+        data_lists = []
+        cur_node = self.head
+        while cur_node is not None:
+            data_lists.append(cur_node.data_list)
+            cur_node = cur_node.next_node
+        if not data_lists:
+            return []
+
+        workers = workers or cpu_count()
+        run_pool = pool or (ThreadPool if threads else Pool)(workers)
+        # A few runs per worker, so that a slow run doesn't hold up the rest
+        run_size = -(-len(data_lists) // (workers * 4))
+        runs = [data_lists[i:i + run_size]
+                for i in xrange(0, len(data_lists), run_size)]
+        try:
+            return run_pool.map(partial(worker, fn), runs, 1)
+        finally:
+            if pool is None:
+                run_pool.terminate()
+                run_pool.join()
+
+    def __node_list(self, data_list):
+        """Returns `data_list` ready to be stored in a node: as is, as an
+        array in typed mode, or in compact mode copied into a list
+        preallocated to max_node_capacity.
+        """
+        if self.typecode is not None:
+            if (isinstance(data_list, array) and
+                    data_list.typecode == self.typecode):
+                return data_list
+            return array(self.typecode, data_list)
+        if not self.preallocate:
+            return data_list
+        node_list = [None] * self.max_node_capacity
+        node_list[:] = data_list
+        return node_list
+
+    def __typed(self, items):
+        """Returns `items` as an array of the list's typecode. Incoming items
+        are converted before the list is changed, so one that doesn't fit
+        the typecode raises with the list as it was.
+        """
+        if isinstance(items, array) and items.typecode == self.typecode:
+            return items
+        if not isinstance(items, (list, tuple)):
+            items = list(items)  # an array would read a string as bytes
+        return array(self.typecode, items)
+
+    def __vectorized(self):
+        """Tells whether node data is handed to NumPy: only for typed nodes,
+        whose items already have a fixed-width machine type.
+        """
+        return numpy is not None and self.typecode is not None
+
+    def __iter_node_data(self):
+        """Yields the items of each node in turn. Typed nodes come as NumPy
+        arrays viewed in place without a copy when NumPy is installed;
+        otherwise the node's own list or array is yielded.
+        """
+        vectorized = self.__vectorized()
+        cur_node = self.head
+        while cur_node is not None:
+            if vectorized:
+                yield numpy.frombuffer(cur_node.data_list, self.typecode)
+            else:
+                yield cur_node.data_list
+            cur_node = cur_node.next_node
+
+    def __count(self, items):
+        """Adds `items`, which are about to be stored, to the value index.
+        In typed mode they are converted to the typecode first, so that the
+        stored values are counted and an item a node can't hold raises
+        before anything is counted. They are all hashed before any is
+        counted, so an unhashable item leaves the index as it was too.
+        """
+        if self.typecode is not None:
+            items = self.__typed(items)
+        self.__counts.update(Counter(items))
+
+    def __uncount(self, items):
+        """Removes `items` from the value index."""
+        counts = self.__counts
+        for item in items:
+            counts[item] -= 1
+            if not counts[item]:
+                del counts[item]
+
+    def __summary_bits(self, item):
+        """Returns the two Bloom filter bits for `item`, or None if it is
+        unhashable. The filter is 8 bits per item a full node holds, which
+        gives about 5% false positives.
+        """
+        try:
+            h = hash(item) * 2654435761
+        except TypeError:
+            return None
+        size = max(64, 8 * self.max_node_capacity)
+        return 1 << h % size | 1 << (h >> 32) % size
+
+    def __summarize(self, cur_node):
+        """Builds the Bloom filter of a node's items. A node holding an
+        unhashable item gets a filter with every bit set.
+        """
+        summary = 0
+        for item in cur_node.data_list:
+            bits = self.__summary_bits(item)
+            if bits is None:
+                return -1
+            summary |= bits
+        return summary
+
+    def __verify_index(self, index):
+        """Verifies that the given index is an int and is not out of bounds. If
+        the index is valid then return True.
+        """
+        if not isinstance(index, int):
+            raise TypeError("Index must be of type int")
+        elif index >= self.length or index < -self.length:
+            raise IndexError("Index out of bounds")
+        return True
+
+    def __find_node_index(self, index):
+        """Finds the node and node list index that corresponds to the
+        given index as well as the indexed node's previous node.
+        """
+        if self.indexed:
+            return self.__find_node_offset(index)
+
+        # The tail is linked both ways, so positions in it cost O(1)
+        if self.tail is not None:
+            tail_start = self.length - len(self.tail.data_list)
+            if index >= tail_start:
+                if self.stats is not None:
+                    self.stats.record('lookups')
+                return index - tail_start, self.tail.prev_node, self.tail
+
+        # Resume from the node found last time unless the list has changed
+        # since; walk back from it if the index is closer to it than to the
+        # head. The finger is a single tuple so that it is replaced in one
+        # step when lookups run on several threads at once.
+        cur_index = origin = 0
+        cur_node = self.head
+        finger_node, finger_start, finger_version = self.__finger
+        if (finger_version == self._version and finger_node is not None and
+                index >= finger_start / 2):
+            cur_index = origin = finger_start
+            cur_node = finger_node
+            while index < cur_index:
+                cur_node = cur_node.prev_node
+                cur_index -= len(cur_node.data_list)
+        prev_node = cur_node.prev_node if cur_node is not None else None
+
+        while cur_node is not None:
+            if index >= len(cur_node.data_list) + cur_index:
+                cur_index += len(cur_node.data_list)
+                prev_node = cur_node
+                cur_node = cur_node.next_node
+            else:
+                index -= cur_index
+                break
+
+        if self.stats is not None:
+            self.stats.record('lookups')
+            self.stats.record('nodes_traversed', self.__count_hops(
+                cur_node, cur_index, origin))
+        if cur_node is not None:
+            if self.adaptive:
+                self.__walked += abs(cur_index - origin)
+            self.__finger = (cur_node, cur_index, self._version)
+        return index, prev_node, cur_node
+
+    def __count_hops(self, cur_node, cur_index, origin):
+        """Counts the nodes a lookup stepped across to reach `cur_node`,
+        which starts at `cur_index`, from the node starting at `origin`.
+        """
+        hops = 0
+        while cur_node is not None and cur_index > origin:
+            cur_node = cur_node.prev_node
+            cur_index -= len(cur_node.data_list)
+            hops += 1
+        while cur_node is not None and cur_index < origin:
+            cur_index += len(cur_node.data_list)
+            cur_node = cur_node.next_node
+            hops += 1
+        return hops
+
+    def __get_slice(self, index):
+        """Builds a new list from the items covered by the slice `index`.
+
+        The start node is located once and the covered part of each node is
+        copied with a list slice. For a step of 1 the pieces are packed into
+        nodes as they come, so a slice of a balanced list keeps its node
+        layout, and then the partial first and last nodes are evened out
+        with their neighbours; other steps are packed like `extend`.
+        Negative steps collect the same positions front to back and reverse
+        them.
+        """
+        start, stop, step = index.indices(self.length)
+        count = len(xrange(start, stop, step))
+        if count == 0:
+            return self.__new_list()
+
+        if step < 0:
+            start, stop, step = start + (count - 1) * step, start + 1, -step
+            items = [x for prev_node, cur_node, begin, end
+                     in self.__iter_spans(start, stop, step)
+                     for x in cur_node.data_list[begin:end:step]]
+            items.reverse()
+            return self.__new_list(items)
+
+        pieces = (cur_node.data_list[begin:end:step] for prev_node, cur_node,
+                  begin, end in self.__iter_spans(start, stop, step))
+        if step > 1:
+            return self.__new_list(x for piece in pieces for x in piece)
+
+        new_list = self.__new_list()
+        data_list = next(pieces)
+        for piece in pieces:
+            if len(data_list) + len(piece) > self.max_node_capacity:
+                new_list.__link_node(data_list)
+                data_list = piece
+            else:
+                data_list += piece
+        new_list.__link_node(data_list)
+        new_list.__fill_node(None, new_list.head)
+        new_list.__even_tail()
+        return new_list
+
+    def __set_slice(self, index, value):
+        """Assigns the items of `value` to the slice `index`.
+
+        A step of 1 splices: the covered range is deleted in one sweep and
+        `value` is packed into nodes linked in at the cut. Other steps follow
+        `list` and replace the covered items one for one, a node at a time.
+        """
+        start, stop, step = index.indices(self.length)
+        if step == 1:
+            if self.typecode is not None:
+                value = self.__typed(value)
+            del self[start:stop]
+            self.__insert(start, value)
+            return
+
+        items = list(value)
+        if self.typecode is not None:
+            items = array(self.typecode, items)
+        count = len(xrange(start, stop, step))
+        if len(items) != count:
+            raise ValueError("attempt to assign sequence of size %d to "
+                             "extended slice of size %d" % (len(items), count))
+        if count == 0:
+            return
+        if step < 0:
+            start, stop, step = start + (count - 1) * step, start + 1, -step
+            items.reverse()
+
+        if self.__counts is not None:
+            self.__count(items)
+            self.__uncount(self[start:stop:step])
+
+        i = 0
+        for prev_node, cur_node, begin, end in self.__iter_spans(start, stop,
+                                                                  step):
+            count = len(cur_node.data_list[begin:end:step])
+            cur_node.data_list[begin:end:step] = items[i:i + count]
+            cur_node.summary = None
+            i += count
+
+    def __del_slice(self, index):
+        """Deletes the items covered by the slice `index` in a single sweep.
+
+        The covered part of each node is deleted with a list slice and nodes
+        left empty are unlinked as they are passed. The surviving nodes of
+        the sweep (for a step of 1, just the two boundary nodes) are then
+        filled back up to half capacity from the nodes after them.
+        """
+        start, stop, step = index.indices(self.length)
+        count = len(xrange(start, stop, step))
+        if count == 0:
+            return
+        if count == self.length:
+            self.clear()
+            return
+        if step < 0:
+            start, stop, step = start + (count - 1) * step, start + 1, -step
+
+        first_prev = None
+        survivors = []
+        for prev_node, cur_node, begin, end in self.__iter_spans(start, stop,
+                                                                  step):
+            size = len(cur_node.data_list)
+            if self.__counts is not None:
+                self.__uncount(cur_node.data_list[begin:end:step])
+            del cur_node.data_list[begin:end:step]
+            self.length -= size - len(cur_node.data_list)
+            if cur_node.data_list:
+                self.__index_resize(cur_node)
+                if not survivors:
+                    first_prev = prev_node
+                survivors.append(cur_node)
+            else:
+                self.__del_node(prev_node, cur_node)
+
+        self.__fill_nodes(first_prev, survivors)
+        self.__invalidate()
+
+    def __iter_spans(self, start, stop, step):
+        """Yields `(prev_node, cur_node, begin, end)` for each node spanned by
+        `xrange(start, stop, step)`, for an in-bounds `start` and a positive
+        `step`. The covered items (none, if the step skips the whole node)
+        are `cur_node.data_list[begin:end:step]`; the caller may delete them,
+        and unlink the node if that empties it, before resuming.
+        """
+        offset, prev_node, cur_node = self.__find_node_index(start)
+        while cur_node is not None and start < stop:
+            size = len(cur_node.data_list)
+            end = offset + stop - start
+            count = len(xrange(offset, min(size, end), step))
+            yield prev_node, cur_node, offset, end
+            start += count * step
+            offset += count * step - size
+            if cur_node.data_list:
+                prev_node = cur_node
+            cur_node = cur_node.next_node
+
+    def __fill_nodes(self, prev_node, nodes):
+        """Fills each of the given consecutive nodes back up to half capacity
+        in order, skipping the ones merged away by an earlier node.
+        """
+        if self.stats is not None:
+            self.stats.record('fills')
+        for cur_node in nodes:
+            if cur_node.data_list:
+                self.__fill_node(prev_node, cur_node)
+                if cur_node.data_list:
+                    prev_node = cur_node
+
+    def __fill_node(self, prev_node, cur_node):
+        """Fills a node that is less than half-full back up from the nodes
+        after it, merging them in while they fit. An under-filled tail is
+        merged into its previous node if it fits there. Merged-away nodes are
+        unlinked and left with an empty list.
+        """
+        half = self.max_node_capacity / 2
+        if len(cur_node.data_list) >= half:
+            return
+        while len(cur_node.data_list) < half:
+            next_node = cur_node.next_node
+            if next_node is None:
+                if (prev_node is not None and len(prev_node.data_list) +
+                        len(cur_node.data_list) <= self.max_node_capacity):
+                    prev_node.data_list += cur_node.data_list
+                    prev_node.summary = None
+                    cur_node.data_list = []
+                    self.__index_resize(prev_node)
+                    self.__del_node(prev_node, cur_node)
+                    if self.stats is not None:
+                        self.stats.record('merges')
+                return
+            if (len(cur_node.data_list) + len(next_node.data_list) <=
+                    self.max_node_capacity):
+                cur_node.data_list += next_node.data_list
+                cur_node.summary = None
+                next_node.data_list = []
+                self.__index_resize(cur_node)
+                self.__del_node(cur_node, next_node)
+                if self.stats is not None:
+                    self.stats.record('merges')
+            else:
+                count = half - len(cur_node.data_list)
+                cur_node.data_list += next_node.data_list[:count]
+                cur_node.summary = None
+                del next_node.data_list[:count]
+                self.__index_resize(cur_node, next_node)
+                if self.stats is not None:
+                    self.stats.record('borrows')
+
+        # The list shrank below half-full, so it lost any preallocation
+        cur_node.data_list = self.__node_list(cur_node.data_list)
+
+    def __even_tail(self):
+        """Evens out a tail that is less than half-full with the node before
+        it, or merges it into that node if they fit in one, so that every
+        node is at least half-full.
+        """
+        prev_node = self.tail.prev_node if self.tail is not None else None
+        if (prev_node is None or
+                len(self.tail.data_list) >= self.max_node_capacity / 2):
+            return
+        self._version += 1
+        data_list = prev_node.data_list + self.tail.data_list
+        prev_node.summary = None
+        if len(data_list) <= self.max_node_capacity:
+            prev_node.data_list = self.__node_list(data_list)
+            self.__index_resize(prev_node)
+            self.__del_node(prev_node, self.tail)
+        else:
+            prev_node.data_list = self.__node_list(
+                data_list[:len(data_list) / 2])
+            self.tail.data_list = self.__node_list(
+                data_list[len(data_list) / 2:])
+            self.tail.summary = None
+            self.__index_resize(prev_node, self.tail)
+
+    def __link_node(self, data_list):
+        """Links a new node holding `data_list` on after the tail."""
+        data_list = self.__node_list(data_list)
+        if self.__counts is not None:
+            self.__count(data_list)
+        new_node = self._new_node(data_list, None, self.tail)
+        if self.tail is None:
+            self.head = new_node
+        else:
+            self.tail.next_node = new_node
+        self.tail = new_node
+        self.length += len(data_list)
+        self.__index_link(new_node)
+
+    def __link_page(self, page, count):
+        """Links a `PagedNode` of `count` items on after the tail, and adds
+        it to the offset index.
+        """
+        new_node = self.PagedNode(page, None, self.tail)
+        if self.tail is None:
+            self.head = new_node
+        else:
+            self.tail.next_node = new_node
+        self.tail = new_node
+        self.length += count
+        self.__index_link(new_node, count)
+
+    def _locate(self, index):
+        """Returns the node and offset for a cursor at `index`, or
+        `(None, 0)` just past the last item.
+        """
+        if index == self.length:
+            return None, 0
+        offset, prev_node, cur_node = self.__find_node_index(index)
+        return cur_node, offset
+
+    def _insert_at(self, cur_node, offset, index, data):
+        """Inserts `data` at `index`, which a cursor has resolved to
+        `offset` in `cur_node`, and returns the node and offset of the
+        position after it.
+        """
+        if cur_node is None:
+            self.append(data)
+            return None, 0
+
+        if self.adaptive:
+            self.__shifted += len(cur_node.data_list) - offset
+        if self.__counts is not None:
+            self.__count([data])
+        cur_node.data_list.insert(offset, data)
+        cur_node.summary = None
+        self.length += 1
+        self.__index_resize(cur_node)
+        offset += 1
+        if len(cur_node.data_list) > self.max_node_capacity:
+            self.__split_node(cur_node)
+        self.__invalidate()
+        return self.__normalize(cur_node, offset)
+
+    def _take_head(self):
+        """Removes the items of the first node and returns them as a
+        list, which is empty if the list is.
+        """
+        if self.head is None:
+            return []
+        data = list(self.head.data_list)
+        del self[:len(data)]
+        return data
+
+    def _new_node(self, data_list, next_node=None, prev_node=None):
+        """Returns a new node of this list's kind holding `data_list`."""
+        return self.Node(data_list, next_node, prev_node)
+
+    def _unlinked(self, cur_node):
+        """Called with each node as it leaves the chain for good."""
+
+    def _set_at(self, cur_node, offset, data):
+        """Replaces the item at `offset` in `cur_node` with `data`."""
+        if self.__counts is not None:
+            self.__count([data])
+            self.__uncount([cur_node.data_list[offset]])
+        cur_node.data_list[offset] = data
+        cur_node.summary = None
+
+    def _delete_at(self, cur_node, offset, index):
+        """Deletes the item at `index`, which a cursor has resolved to
+        `offset` in `cur_node`, and returns it along with the node and offset
+        of the item that followed it.
+        """
+        if self.adaptive:
+            self.__shifted += len(cur_node.data_list) - offset
+        data = cur_node.data_list[offset]
+        if self.__counts is not None:
+            self.__uncount([data])
+        del cur_node.data_list[offset]
+        self.length -= 1
+        self.__index_resize(cur_node)
+
+        prev_node = cur_node.prev_node
+        prev_size = len(prev_node.data_list) if prev_node is not None else 0
+        was_tail = cur_node is self.tail
+        self.__balance_node(prev_node, cur_node)
+        self.__invalidate()
+
+        # An under-filled tail may have been merged into its previous node
+        if was_tail and cur_node.data_list and cur_node is not self.tail:
+            cur_node, offset = prev_node, prev_size + offset
+        return (data,) + self.__normalize(cur_node, offset)
+
+    def __normalize(self, cur_node, offset):
+        """Moves an offset that runs off the end of its node on to the nodes
+        after it, ending at `(None, 0)` past the last item.
+        """
+        while cur_node is not None and offset >= len(cur_node.data_list):
+            offset -= len(cur_node.data_list)
+            cur_node = cur_node.next_node
+        if cur_node is None:
+            offset = 0
+        return cur_node, offset
+
+    def __find_node_offset(self, index):
+        """Same as __find_node_index, but finds the node in the offset index
+        instead of walking from the head.
+        """
+        if self.head is None:
+            return index, None, None
+        if self.stats is not None:
+            self.stats.record('lookups')
+        cur_node, start = self.__offsets.find(index)
+        return index - start, cur_node.prev_node, cur_node
+
+    def __index_link(self, cur_node, size=None):
+        """Adds a node just linked into the chain to the offset index, if
+        the list has one. `size` saves reading the items of a paged node.
+        """
+        if self.__offsets is not None:
+            if size is None:
+                size = len(cur_node.data_list)
+            self.__offsets.insert(cur_node.prev_node, cur_node, size)
+
+    def __index_resize(self, *nodes):
+        """Brings the offset index, if the list has one, up to date with the
+        item counts of the given nodes.
+        """
+        if self.__offsets is not None:
+            for cur_node in nodes:
+                self.__offsets.resize(cur_node, len(cur_node.data_list))
+
+    def __invalidate(self):
+        """Records a mutation, so that outstanding cursors and the finger
+        re-resolve their positions on next use.
+        """
+        self._version += 1
+
+    def __insert(self, index, value):
+        """Splices the items of `value` into the list before `index`.
+
+        The node holding `index` is cut in two and `value` is packed into
+        full nodes linked in between the halves; only the nodes around the
+        two seams are then filled back up to half capacity.
+        """
+        if index == self.length:
+            self.extend(value)
+            return
+        if self.adaptive:
+            self.__tick()
+        if self.__counts is not None:
+            self.__count(value)
+
+        offset, prev_node, cur_node = self.__find_node_index(index)
+        if self.adaptive:
+            self.__shifted += len(cur_node.data_list) - offset
+        it = iter(value)
+        data_lists = [cur_node.data_list[:offset]]
+        chunk = list(islice(it, self.max_node_capacity))
+        while chunk:
+            data_lists.append(chunk)
+            self.length += len(chunk)
+            chunk = list(islice(it, self.max_node_capacity))
+        data_lists.append(cur_node.data_list[offset:])
+        data_lists = [data_list for data_list in data_lists if data_list]
+
+        # Reuse the cut node for the first piece and link the rest after it
+        next_node = cur_node.next_node
+        cur_node.data_list = self.__node_list(data_lists[0])
+        cur_node.summary = None
+        new_nodes = [cur_node]
+        for data_list in data_lists[1:]:
+            new_nodes[-1].next_node = self._new_node(
+                self.__node_list(data_list), None, new_nodes[-1])
+            new_nodes.append(new_nodes[-1].next_node)
+        new_nodes[-1].next_node = next_node
+        if cur_node is self.tail:
+            self.tail = new_nodes[-1]
+        else:
+            next_node.prev_node = new_nodes[-1]
+        self.__index_resize(cur_node)
+        for new_node in new_nodes[1:]:
+            self.__index_link(new_node)
+
+        self.__fill_nodes(prev_node, new_nodes)
+        self.__invalidate()
+
+    def __split_node(self, cur_node):
+        """Creates a new node and splits the current contents of data_list evenly
+        among them. The current node will point to the new node and the new node
+        will point to the initial next_node
+        """
+        self._version += 1
+        if self.stats is not None:
+            self.stats.record('splits')
+        temp = self._new_node(
+            self.__node_list(cur_node.data_list[len(cur_node.data_list) / 2:]),
+            cur_node.next_node, cur_node)
+        cur_node.data_list = self.__node_list(
+            cur_node.data_list[:len(cur_node.data_list) / 2])
+        cur_node.next_node = temp
+        temp.summary = cur_node.summary
+
+        if cur_node == self.tail:
+            self.tail = cur_node.next_node
+        else:
+            temp.next_node.prev_node = temp
+        self.__index_resize(cur_node)
+        self.__index_link(temp)
+
+    def __balance_node(self, prev_node, cur_node):
+        """Balances a node that has its list less than half-full.
+        """
+        # node is empty?
+        if not cur_node.data_list:
+            self.__del_node(prev_node, cur_node)
+
+        elif len(cur_node.data_list) >= self.max_node_capacity / 2:
+            return
+
+        # node is not tail?
+        elif cur_node != self.tail:
+            if len(cur_node.next_node.data_list) - 1 < self.max_node_capacity / 2:
+                cur_node.data_list += cur_node.next_node.data_list
+                cur_node.summary = None
+                self.__index_resize(cur_node)
+                self.__del_node(cur_node, cur_node.next_node)
+                if self.stats is not None:
+                    self.stats.record('merges')
+            else:
+                cur_node.data_list.append(cur_node.next_node.data_list[0])
+                cur_node.summary = None
+                del cur_node.next_node.data_list[0]
+                self.__index_resize(cur_node, cur_node.next_node)
+                if self.stats is not None:
+                    self.stats.record('borrows')
+            cur_node.data_list = self.__node_list(cur_node.data_list)
+        elif (prev_node is not None and len(prev_node.data_list) +
+                len(cur_node.data_list) <= self.max_node_capacity):
+            prev_node.data_list += cur_node.data_list
+            prev_node.summary = None
+            self.__index_resize(prev_node)
+            self.__del_node(prev_node, cur_node)
+            if self.stats is not None:
+                self.stats.record('merges')
+
+    def __del_node(self, prev_node, cur_node):
+        """Deletes the given node by pointing the previous node to the
+        current node's next node, and the next node back to the previous node
+        """
+        if self.stats is not None:
+            self.stats.record('unlinks')
+        if self.__offsets is not None:
+            self.__offsets.remove(cur_node)
+        self._unlinked(cur_node)
+        if len(self) == 0:
+            self.head = None
+            self.tail = None
+            return
+        elif prev_node is None:
+            self.head = cur_node.next_node
+        else:
+            prev_node.next_node = cur_node.next_node
+
+        if cur_node == self.tail:
+            self.tail = prev_node
+        else:
+            cur_node.next_node.prev_node = prev_node
+
+    def __tick(self):
+        """Counts a lookup, edit or append in adaptive mode. Every
+        ADAPTIVE_WINDOW of them, or every 32 once they cost more than
+        re-chunking the list would, the list is re-chunked if the measured
+        cost favours another capacity and enough has been spent since the
+        last re-chunk to pay for another.
+        """
+        self.__ops += 1
+        if self.__ops < self.ADAPTIVE_WINDOW and self.__ops % 32:
+            return
+        item_size = self.__item_size()
+        spent = self.__spent + (
+            self.ADAPTIVE_HOP_COST * self.__walked /
+            (self.ADAPTIVE_FILL * self.max_node_capacity) +
+            self.ADAPTIVE_SHIFT_COST * item_size * self.__shifted)
+        cost = self.length * (self.ADAPTIVE_MOVE_COST +
+                              self.ADAPTIVE_NODE_COST /
+                              self.ADAPTIVE_MAX_CAPACITY)
+        if self.__ops < self.ADAPTIVE_WINDOW and spent < cost:
+            return
+
+        capacity = self.__tuned_capacity(item_size)
+        self.__spent = spent
+        self.__ops = 0
+        self.__walked = 0
+        self.__shifted = 0
+        if capacity == self.max_node_capacity:
+            return
+        cost = self.length * (self.ADAPTIVE_MOVE_COST +
+                              self.ADAPTIVE_NODE_COST / capacity)
+        if spent >= cost:
+            self.__spent = 0.0
+            self.__rechunk(capacity)
+
+    def __item_size(self):
+        """Returns the bytes a node's storage takes per item."""
+        if self.typecode is not None:
+            return array(self.typecode).itemsize
+        return calcsize('P')  # nodes hold pointers to the items
+
+    def __tuned_capacity(self, item_size):
+        """Returns the capacity that minimizes the cost measured since the
+        last check, for items taking `item_size` bytes in a node.
+
+        Walking W items takes about W / (fill * B) node hops at capacity B,
+        while the S items shifted by edits grow in proportion to B. The sum
+        HOP * W / (fill * B) + SHIFT * size * S * B / B0 is least at
+        B = sqrt(HOP * W * B0 / (fill * SHIFT * size * S)), which is rounded
+        to a power of two. Appended items count as walked, since each costs
+        a share of a new node, which shrinks as B grows just as hops do.
+        """
+        if not self.__walked and not self.__shifted:
+            return self.max_node_capacity
+        elif not self.__shifted:
+            return self.ADAPTIVE_MAX_CAPACITY
+        elif not self.__walked:
+            return self.ADAPTIVE_MIN_CAPACITY
+
+        capacity = sqrt(self.ADAPTIVE_HOP_COST * self.__walked *
+                        self.max_node_capacity /
+                        (self.ADAPTIVE_FILL * self.ADAPTIVE_SHIFT_COST * item_size *
+                         self.__shifted))
+        capacity = 1 << int(round(log(max(capacity, 1), 2)))
+        return min(max(capacity, self.ADAPTIVE_MIN_CAPACITY),
+                   self.ADAPTIVE_MAX_CAPACITY)
+
+    def __rechunk(self, capacity):
+        """Repacks every item into nodes of the given capacity."""
+        self.max_node_capacity = capacity
+        self.__repack(capacity)
+
+    def __repack(self, node_size):
+        """Repacks every item into nodes of `node_size` items in one pass.
+        A short last node is merged into the one before it, or evened out
+        with it if they don't fit in one node.
+        """
+        it = chain.from_iterable(self.__drain(self.head))
+        self.head = None
+        self.tail = None
+        self.length = 0
+        if self.__offsets is not None:
+            self.__offsets.clear()
+
+        # The items only move between nodes, so the value index stands
+        counts, self.__counts = self.__counts, None
+        chunk = list(islice(it, node_size))
+        while chunk:
+            self.__link_node(chunk)
+            chunk = list(islice(it, node_size))
+        self.__counts = counts
+        self.__even_tail()
+        self.__invalidate()
+
+    def __drain(self, cur_node):
+        """Yields the item lists of a detached chain of nodes from
+        `cur_node` on, letting go of each node once its items are taken.
+        """
+        while cur_node is not None:
+            next_node = cur_node.next_node
+            if next_node is not None:
+                next_node.prev_node = None  # so taken nodes can be freed
+            yield cur_node.data_list
+            self._unlinked(cur_node)
+            cur_node = next_node
+
+    @property
+    def max_node_size(self):
+        """Returns the max capacity for each node, which in adaptive mode is
+        the capacity currently in use
+        """
+        return self.max_node_capacity
+
+
+# The storage behind `Node.data_list`, which `PagedNode` fills in on demand
+_node_data_list = UnrolledLinkedList.Node.data_list
+
+
+class SortedUnrolledLinkedList(UnrolledLinkedList):
+    """ An unrolled linked list that keeps its items in sorted order.
+
+    Items are placed with `add` rather than by position: the node is found by
+    bisecting a directory of each node's largest item, and the position by
+    bisecting within that node, so an insert costs O(log n + B) for node
+    capacity B. A full node is split as in an unsorted list. Everything that
+    reads the list or deletes from it works as for `UnrolledLinkedList`,
+    cursors included; slices, `+` and `*` give plain unrolled linked lists.
+
+    Usage: `
+        my_list = SortedUnrolledLinkedList([5, 1, 3])
+        my_list.add(2)
+        list(my_list.irange(2, 4))  # [2, 3]
+    `
+    """
+
+    __slots__ = ('__nodes', '__maxes', '__starts', '__dir_version')
+
+    def __init__(self, iterable=None, max_node_capacity=16, compact=False,
+                 typecode=None):
+        """ The constructor for the sorted list, which takes the same
+        arguments as `UnrolledLinkedList` apart from `indexed` and `adaptive`.
+        The sorted list keeps its own directory of nodes instead.
+        """
+        if isinstance(iterable, int):
+            iterable, max_node_capacity = None, iterable
+        super(SortedUnrolledLinkedList, self).__init__(
+            max_node_capacity=max_node_capacity, compact=compact,
+            typecode=typecode)
+        self.__reset_directory()
+
+        if iterable is not None:
+            self.update(iterable)
+
+    def __setstate__(self, state):
+        """ Rebuilds the sorted list from `__getstate__`'s state. """
+        UnrolledLinkedList.__setstate__(self, state)
+        self.__reset_directory()
+
+    def add(self, value):
+        """ Inserts `value` in sorted order, after any equal items.
+
+        Usage: `my_list.add(4)`
+        """
+        nodes, maxes = self.__directory()
+        if not nodes:
+            UnrolledLinkedList.append(self, value)
+            self.__dir_version = -1
+            return
+
+        pos = min(bisect_right(maxes, value), len(nodes) - 1)
+        cur_node = nodes[pos]
+        UnrolledLinkedList._insert_at(
+            self, cur_node, bisect_right(cur_node.data_list, value), 0, value)
+        # A split links one new node in after the node inserted into
+        self.__resync(pos, pos + 1)
+
+    def update(self, iterable):
+        """ Adds every object from `iterable`.
+
+        A few objects are added one at a time; many are merged with the
+        list's items by re-sorting them all and packing the result like
+        `extend`.
+
+        Usage: `my_list.update(range(10))`
+        """
+        values = list(iterable)
+        if len(values) * 10 < self.length:
+            for value in values:
+                self.add(value)
+            return
+
+        values.extend(self)
+        values.sort()
+        self.clear()
+        UnrolledLinkedList.extend(self, values)
+
+    def discard(self, value):
+        """ Removes one item equal to `value`, if there is one.
+
+        Usage: `my_list.discard(4)`
+        """
+        nodes, maxes = self.__directory()
+        pos = bisect_left(maxes, value)
+        if pos == len(nodes):
+            return
+        cur_node = nodes[pos]
+        offset = bisect_left(cur_node.data_list, value)
+        if cur_node.data_list[offset] != value:
+            return
+
+        self._delete_at(cur_node, offset, 0)
+        # Balancing may merge the node into the one before it or merge the
+        # one after it in, but doesn't touch any others
+        self.__resync(max(pos - 1, 0), pos + 2)
+
+    def bisect_left(self, value):
+        """ Returns the position `value` would be inserted at before any
+        equal items, as with `bisect.bisect_left`.
+        """
+        nodes, maxes = self.__directory()
+        pos = bisect_left(maxes, value)
+        if pos == len(nodes):
+            return self.length
+        return self.__start(pos) + bisect_left(nodes[pos].data_list, value)
+
+    def bisect_right(self, value):
+        """ Returns the position `value` would be inserted at after any
+        equal items, as with `bisect.bisect_right`.
+        """
+        nodes, maxes = self.__directory()
+        pos = bisect_right(maxes, value)
+        if pos == len(nodes):
+            return self.length
+        return self.__start(pos) + bisect_right(nodes[pos].data_list, value)
+
+    def index(self, value, start=0, stop=None):
+        """ Returns the position of the first item equal to `value` within
+        `start` and `stop`, which are taken as with `list.index`.
+
+        Raises:
+            ValueError: If there is no such item.
+        """
+        start, stop, step = slice(start, stop).indices(self.length)
+        nodes, maxes = self.__directory()
+        pos = bisect_left(maxes, value)
+        if pos < len(nodes):
+            data_list = nodes[pos].data_list
+            offset = bisect_left(data_list, value)
+            if data_list[offset] == value:
+                index = max(self.__start(pos) + offset, start)
+                if index < stop and self[index] == value:
+                    return index
+        raise ValueError("%r is not in list" % (value,))
+
+    def count(self, value):
+        """ Returns the number of items equal to `value`, found by
+        bisection.
+        """
+        return self.bisect_right(value) - self.bisect_left(value)
+
+    def irange(self, minimum=None, maximum=None, inclusive=(True, True)):
+        """ Yields the items from `minimum` to `maximum` in order.
+
+        Only the node holding the first item is searched for; the rest are
+        read by following the node links.
+
+        Usage: `for value in my_list.irange(10, 20):`
+
+        Args:
+            minimum: The lowest item to yield, or None to start from the
+                first item.
+            maximum: The highest item to yield, or None to end with the last
+                item.
+            inclusive: A pair of bools saying whether items equal to
+                `minimum` and `maximum` are yielded.
+        """
+        nodes, maxes = self.__directory()
+        if minimum is None:
+            pos = offset = 0
+        else:
+            find = bisect_left if inclusive[0] else bisect_right
+            pos = find(maxes, minimum)
+            if pos == len(nodes):
+                return
+            offset = find(nodes[pos].data_list, minimum)
+
+        # Items equal to an inclusive maximum may run on into the next node
+        cur_node = nodes[pos] if nodes else None
+        while cur_node is not None:
+            data_list = cur_node.data_list
+            if maximum is not None and (maximum < data_list[-1] or
+                                        not inclusive[1] and
+                                        maximum == data_list[-1]):
+                find = bisect_right if inclusive[1] else bisect_left
+                for value in islice(data_list, offset,
+                                    find(data_list, maximum)):
+                    yield value
+                return
+            for value in islice(data_list, offset, None):
+                yield value
+            cur_node = cur_node.next_node
+            offset = 0
+
+    def __contains__(self, item):
+        """ Returns True/False whether the list contains the given item,
+        found by bisection rather than a scan.
+        """
+        nodes, maxes = self.__directory()
+        pos = bisect_left(maxes, item)
+        if pos == len(nodes):
+            return False
+        data_list = nodes[pos].data_list
+        return data_list[bisect_left(data_list, item)] == item
+
+    def copy(self):
+        """ Returns a shallow copy of the sorted list. """
+        return SortedUnrolledLinkedList(
+            self, max_node_capacity=self.max_node_capacity,
+            compact=self.preallocate, typecode=self.typecode)
+
+    __copy__ = copy
+
+    def __add__(self, other):
+        """ Returns a plain unrolled linked list of this list's items
+        followed by those of `other`, as slices and `*` do; the result is
+        not sorted, so it can't be a sorted list.
+
+        Raises:
+            TypeError: If `other` is not an unrolled linked list.
+        """
+        if not isinstance(other, UnrolledLinkedList):
+            raise TypeError("Can only add object of type UnrolledLinkedList")
+
+        new_list = self[:]
+        new_list.extend(other)
+        return new_list
+
+    def __unsupported(self, *args):
+        raise TypeError("A sorted list places its items itself; "
+                        "use add() or update()")
+
+    append = extend = appendleft = extendleft = __unsupported
+    __setitem__ = __iadd__ = __imul__ = __unsupported
+    # Cursors can read and delete, but not write by position
+    _insert_at = _set_at = __unsupported
+
+    def __reset_directory(self):
+        """Empties the directory, to be rebuilt on next use."""
+        self.__nodes = []
+        self.__maxes = []
+        self.__starts = []
+        self.__dir_version = -1
+
+    def __directory(self):
+        """Returns the nodes and the largest item of each, rebuilding them
+        if the list was changed other than by `add` and `discard`.
+        """
+        if self.__dir_version != self._version:
+            nodes = []
+            cur_node = self.head
+            while cur_node is not None:
+                nodes.append(cur_node)
+                cur_node = cur_node.next_node
+            self.__nodes = nodes
+            self.__maxes = [node.data_list[-1] for node in nodes]
+            self.__starts = []
+            self.__dir_version = self._version
+        return self.__nodes, self.__maxes
+
+    def __resync(self, lo, hi):
+        """Brings the directory entries from `lo` up to `hi` (exclusive) back
+        in line with the nodes, after an edit that only changed those nodes.
+        """
+        nodes = self.__nodes
+        stop = nodes[hi] if hi < len(nodes) else None
+        cur_node = nodes[lo - 1].next_node if lo > 0 else self.head
+        window = []
+        while cur_node is not stop:
+            window.append(cur_node)
+            cur_node = cur_node.next_node
+        nodes[lo:hi] = window
+        self.__maxes[lo:hi] = [node.data_list[-1] for node in window]
+        del self.__starts[lo + 1:]
+        self.__dir_version = self._version
+
+    def __start(self, pos):
+        """Returns the list index of the first item in the node at `pos`.
+        The starts are a prefix extended lazily.
+        """
+        nodes = self.__nodes
+        starts = self.__starts
+        if not starts:
+            starts.append(0)
+        while len(starts) <= pos:
+            starts.append(starts[-1] + len(nodes[len(starts) - 1].data_list))
+        return starts[pos]
+
+
+class DiskUnrolledLinkedList(UnrolledLinkedList):
+    """ An unrolled linked list whose nodes keep their items in a page file,
+    with only the most recently used `cache_nodes` of them held in memory.
+
+    A node's items are read from its page the first time they are used and
+    dropped again when it is the least recently used node past the cache
+    size. Nodes whose items changed while in memory are written back to
+    their page as they are dropped, and by `flush`. The nodes themselves
+    stay linked in memory, so the list costs about 100 bytes per node while
+    its items can be larger than RAM. A node counts as changed once its
+    items have been handed out, since they may then be edited in place.
+
+    The list is always `indexed`: lookups search the offset index instead
+    of reading every page they pass, and edits only update the index for the
+    nodes they change. Slices and `*` give ordinary in-memory lists, while
+    `+` gives a new disk list in a page file of its own, as `copy` does.
+    `close` closes the page file once the list is no longer needed.
+
+    Usage: `
+        log = DiskUnrolledLinkedList(max_node_capacity=1024, cache_nodes=256)
+        log.extend(records)
+        log.flush()
+    `
+    """
+
+    __slots__ = ('cache_nodes', '__file', '__end', '__free', '__resident',
+                 '__last')
+
+    class Node(UnrolledLinkedList.Node):
+        """ A node of a `DiskUnrolledLinkedList`, which reads its items from
+            its page when they aren't in memory
+        """
+
+        __slots__ = ('owner', 'offset', 'size', 'room', 'dirty')
+
+        def __init__(self, owner, data_list, next_node=None, prev_node=None):
+            """
+            :param owner: The DiskUnrolledLinkedList holding the node
+            :param data_list: Initial list to be stored
+            :param next_node: Pointer to the next Node in the Linked List
+            :param prev_node: Pointer to the previous Node in the Linked List
+            """
+            self.owner = owner
+            self.offset = None
+            self.size = 0
+            self.room = 0
+            self.dirty = True
+            self.next_node = next_node
+            self.prev_node = prev_node
+            self.summary = None
+            self.data_list = data_list
+
+        @property
+        def data_list(self):
+            try:
+                data_list = _node_data_list.__get__(self)
+            except AttributeError:
+                data_list = self.owner._read_page(self)
+                _node_data_list.__set__(self, data_list)
+            self.dirty = True
+            self.owner._touch(self)
+            return data_list
+
+        @data_list.setter
+        def data_list(self, data_list):
+            _node_data_list.__set__(self, data_list)
+            self.dirty = True
+            self.owner._touch(self)
+
+    def __init__(self, iterable=None, max_node_capacity=16, typecode=None,
+                 cache_nodes=64, path=None):
+        """ The constructor for the list, which takes the arguments of
+        `UnrolledLinkedList` that apply to it, and:
+
+        `cache_nodes`, the most nodes to keep in memory at once. The items
+        of a few neighbouring nodes are used together while balancing, so it
+        must be at least 4.
+
+        `path`, where to create the page file. By default it is an anonymous
+        temporary file. Either way the file is scratch space for this list
+        and is truncated when opened; use `dump` to save a list.
+        """
+        if isinstance(iterable, int):
+            iterable, max_node_capacity = None, iterable
+
+        assert isinstance(cache_nodes, int)
+        assert cache_nodes >= 4
+        super(DiskUnrolledLinkedList, self).__init__(
+            max_node_capacity=max_node_capacity, indexed=True,
+            typecode=typecode)
+        self.cache_nodes = cache_nodes
+        self.__file = TemporaryFile() if path is None else open(path, 'w+b')
+        self.__end = 0
+        self.__free = {}
+        self.__resident = OrderedDict()
+        self.__last = None
+
+        if iterable is not None:
+            self.extend(iterable)
+
+    def flush(self):
+        """ Writes back the items of every node in memory that changed, and
+        flushes the page file.
+        """
+        for node in self.__resident:
+            self.__write_page(node)
+        self.__file.flush()
+
+    def close(self):
+        """ Closes the page file. The list can't be used afterwards. """
+        self.__file.close()
+
+    def clear(self):
+        """ Removes every object from the list and empties the page file. """
+        super(DiskUnrolledLinkedList, self).clear()
+        self.__resident.clear()
+        self.__last = None
+        self.__file.truncate(0)
+        self.__end = 0
+        self.__free = {}
+
+    def copy(self):
+        """ Returns a shallow copy of the list, in a new page file. """
+        return DiskUnrolledLinkedList(self,
+                                      max_node_capacity=self.max_node_capacity,
+                                      typecode=self.typecode,
+                                      cache_nodes=self.cache_nodes)
+
+    __copy__ = copy
+
+    def __getstate__(self):
+        state = super(DiskUnrolledLinkedList, self).__getstate__()
+        state['cache_nodes'] = self.cache_nodes
+        return state
+
+    def __setstate__(self, state):
+        """ Rebuilds the list from `__getstate__`'s state (or `load`'s), in
+        a new page file.
+        """
+        settings = state['settings']
+        DiskUnrolledLinkedList.__init__(
+            self, chain.from_iterable(state['data_lists']),
+            max_node_capacity=settings['max_node_capacity'],
+            typecode=settings['typecode'],
+            cache_nodes=state.get('cache_nodes', 64))
+
+    @classmethod
+    def load(cls, fp, lazy=False):
+        """ Reads a list written by `dump` into a new page file. The pages
+        are always read in full, since the page file keeps them out of
+        memory anyway.
+        """
+        return super(DiskUnrolledLinkedList, cls).load(fp)
+
+    def _new_node(self, data_list, next_node=None, prev_node=None):
+        return self.Node(self, data_list, next_node, prev_node)
+
+    def _touch(self, node):
+        """Marks `node` as the most recently used, dropping the items of the
+        least recently used node if that takes the cache over size.
+        """
+        if node is self.__last:
+            return
+        self.__last = node
+        resident = self.__resident
+        resident.pop(node, None)
+        resident[node] = None
+        if len(resident) > self.cache_nodes:
+            old_node = resident.popitem(last=False)[0]
+            self.__write_page(old_node)
+            _node_data_list.__delete__(old_node)
+
+    def _unlinked(self, node):
+        """Drops an unlinked node from the cache and frees its page."""
+        self.__resident.pop(node, None)
+        if node is self.__last:
+            self.__last = None
+        self.__release(node)
+
+    def _read_page(self, node):
+        """Reads a node's items from its page."""
+        self.__file.seek(node.offset)
+        page = self.__file.read(node.size)
+        if self.typecode is None:
+            return loads(page)
+        data_list = array(self.typecode)
+        data_list.fromstring(page)
+        return data_list
+
+    def __write_page(self, node):
+        """Writes a node's items to its page if they may have changed since
+        it was last written. The page is rewritten in place when they fit in
+        it; otherwise its space is freed and they go to a new page. Pickled
+        pages get room rounded up to a power of two, so that they can grow
+        in place and freed pages are easily reused.
+        """
+        if not node.dirty:
+            return
+        data_list = _node_data_list.__get__(node)
+        if self.typecode is None:
+            page = dumps(list(data_list), 2)
+            room = 1 << (len(page) - 1).bit_length()
+        else:
+            # Balancing may leave a plain list in a node for a moment
+            page = array(self.typecode, data_list).tostring()
+            room = max(len(page), self.max_node_capacity *
+                       array(self.typecode).itemsize)
+
+        if node.offset is None or len(page) > node.room:
+            self.__release(node)
+            node.offset = self.__allocate(room)
+            node.room = room
+        self.__file.seek(node.offset)
+        self.__file.write(page)
+        node.size = len(page)
+        node.dirty = False
+
+    def __allocate(self, room):
+        """Returns the offset of a free page of `room` bytes, reusing a
+        freed one if there is one.
+        """
+        offsets = self.__free.get(room)
+        if offsets:
+            return offsets.pop()
+        offset = self.__end
+        self.__end += room
+        return offset
+
+    def __release(self, node):
+        """Frees a node's page, if it has one."""
+        if node.offset is not None:
+            self.__free.setdefault(node.room, []).append(node.offset)
+            node.offset = None
+
+
+def _locked(name, write=False):
+    """Returns the `UnrolledLinkedList` method `name`, wrapped to hold a
+    `ConcurrentUnrolledLinkedList`'s lock while it runs: for writing if
+    `write`, otherwise for reading.
+    """
+    method = getattr(UnrolledLinkedList, name)
+
+    if write:
+        def locked(self, *args, **kwargs):
+            self.lock.acquire_write()
+            try:
+                return method(self, *args, **kwargs)
+            finally:
+                self.lock.release_write()
+    else:
+        def locked(self, *args, **kwargs):
+            self.lock.acquire_read()
+            try:
+                return method(self, *args, **kwargs)
+            finally:
+                self.lock.release_read()
+    return wraps(method)(locked)
+
+
+class ConcurrentUnrolledLinkedList(UnrolledLinkedList):
+    """ An unrolled linked list that can be shared between threads.
+
+    Anything that links, unlinks or resizes nodes holds `lock` for writing,
+    so it runs alone. Lookups, searches and copies hold it for reading and
+    run alongside each other. Replacing an item in place, with
+    `my_list[i] = x`, only holds it for reading plus the lock of the one
+    node the item is in, so threads writing to different nodes don't wait
+    for each other.
+
+    Iteration takes no lock. It is weakly consistent: it never raises, and
+    each node's items are copied as the iterator reaches the node, so edits
+    inside that node don't shift items under it. Items that a concurrent
+    edit moves between nodes (a split, borrow or merge) may still be
+    skipped or seen twice, and a concurrent `compact()` can end a reverse
+    iteration early. Iterate over `snapshot()` to see the list as it was at
+    one moment.
+
+    The list takes the arguments of `UnrolledLinkedList` apart from
+    `indexed`, `adaptive`, `summaries` and `value_index`, which all keep
+    state that lookups would update concurrently. Cursors aren't
+    synchronized beyond their edits, so each should be used by one thread.
+
+    Usage: `
+        shared = ConcurrentUnrolledLinkedList(max_node_capacity=64)
+        shared.append(x)  # from any thread
+        with shared.lock.writing():
+            if shared:
+                shared.pop()
+    `
+    """
+
+    __slots__ = ('lock',)
+
+    class Node(UnrolledLinkedList.Node):
+        """ A node with a lock of its own, held while one of its items is
+            replaced
+        """
+
+        __slots__ = ('lock',)
+
+        def __init__(self, data_list, next_node=None, prev_node=None):
+            """
+            :param data_list: Initial list to be stored
+            :param next_node: Pointer to the next Node in the Linked List
+            :param prev_node: Pointer to the previous Node in the Linked List
+            """
+            super(ConcurrentUnrolledLinkedList.Node, self).__init__(
+                data_list, next_node, prev_node)
+            self.lock = Lock()
+
+    class ReadWriteLock(object):
+        """ A lock that any number of threads can hold for reading at once,
+            or one thread alone for writing
+
+        Writers go first: once a thread is waiting to write, threads that
+        don't already hold the lock wait to read until it's done. The lock
+        is reentrant, and the thread holding it for writing can also take it
+        for reading, but a thread reading can't then take it for writing.
+        """
+
+        __slots__ = ('__cond', '__readers', '__writer', '__depth',
+                     '__waiting')
+
+        def __init__(self):
+            self.__cond = Condition(Lock())
+            self.__readers = {}  # thread id -> times it holds a read lock
+            self.__writer = None
+            self.__depth = 0
+            self.__waiting = 0
+
+        def acquire_read(self):
+            me = get_ident()
+            with self.__cond:
+                if me not in self.__readers and self.__writer != me:
+                    while self.__writer is not None or self.__waiting:
+                        self.__cond.wait()
+                self.__readers[me] = self.__readers.get(me, 0) + 1
+
+        def release_read(self):
+            me = get_ident()
+            with self.__cond:
+                count = self.__readers.pop(me) - 1
+                if count:
+                    self.__readers[me] = count
+                elif not self.__readers:
+                    self.__cond.notify_all()
+
+        def acquire_write(self):
+            """
+            Raises:
+                RuntimeError: If this thread holds the lock for reading only,
+                    since waiting for the other readers could deadlock.
+            """
+            me = get_ident()
+            with self.__cond:
+                if self.__writer != me:
+                    if me in self.__readers:
+                        raise RuntimeError("Can't upgrade a read lock to a "
+                                           "write lock")
+                    self.__waiting += 1
+                    try:
+                        while self.__writer is not None or self.__readers:
+                            self.__cond.wait()
+                    finally:
+                        self.__waiting -= 1
+                    self.__writer = me
+                self.__depth += 1
+
+        def release_write(self):
+            with self.__cond:
+                self.__depth -= 1
+                if not self.__depth:
+                    self.__writer = None
+                    self.__cond.notify_all()
+
+        @contextmanager
+        def reading(self):
+            """ Holds the lock for reading within a `with` block. """
+            self.acquire_read()
+            try:
+                yield
+            finally:
+                self.release_read()
+
+        @contextmanager
+        def writing(self):
+            """ Holds the lock for writing within a `with` block, to make
+            several operations on the list atomic.
+            """
+            self.acquire_write()
+            try:
+                yield
+            finally:
+                self.release_write()
+
+    def __init__(self, iterable=None, max_node_capacity=16, compact=False,
+                 typecode=None):
+        """ The constructor for the list, which takes the same arguments as
+        `UnrolledLinkedList` apart from the modes listed above.
+        """
+        if isinstance(iterable, int):
+            iterable, max_node_capacity = None, iterable
+        self.lock = self.ReadWriteLock()
+        super(ConcurrentUnrolledLinkedList, self).__init__(
+            iterable, max_node_capacity=max_node_capacity, compact=compact,
+            typecode=typecode)
+
+    def __setitem__(self, index, value):
+        """ Sets the item at the given index, or assigns a slice as in
+        `UnrolledLinkedList`. A single item is replaced under its node's
+        lock, alongside other readers and writers of single items.
+        """
+        if isinstance(index, slice):
+            self.lock.acquire_write()
+            try:
+                UnrolledLinkedList.__setitem__(self, index, value)
+            finally:
+                self.lock.release_write()
+            return
+
+        self.lock.acquire_read()
+        try:
+            UnrolledLinkedList.__setitem__(self, index, value)
+        finally:
+            self.lock.release_read()
+
+    def _set_at(self, cur_node, offset, data):
+        with cur_node.lock:
+            UnrolledLinkedList._set_at(self, cur_node, offset, data)
+
+    def __iter__(self):
+        """ Iterates without the lock, over a copy of each node's items. """
+        cur_node = self.head
+        while cur_node is not None:
+            for x in cur_node.data_list[:]:
+                yield x
+            cur_node = cur_node.next_node
+
+    def __reversed__(self):
+        """ Iterates from the back without the lock, over a copy of each
+        node's items.
+        """
+        cur_node = self.tail
+        while cur_node is not None:
+            for x in reversed(cur_node.data_list[:]):
+                yield x
+            cur_node = cur_node.prev_node
+
+    def snapshot(self):
+        """ Returns a shallow copy of the list as an `UnrolledLinkedList`,
+        taken while no other thread can change it.
+        """
+        self.lock.acquire_read()
+        try:
+            return UnrolledLinkedList.copy(self)
+        finally:
+            self.lock.release_read()
+
+    def copy(self):
+        """ Returns a shallow copy of the list, which is also concurrent. """
+        self.lock.acquire_read()
+        try:
+            return ConcurrentUnrolledLinkedList(
+                self, max_node_capacity=self.max_node_capacity,
+                compact=self.preallocate, typecode=self.typecode)
+        finally:
+            self.lock.release_read()
+
+    __copy__ = copy
+
+    def __setstate__(self, state):
+        """ Rebuilds the list from `__getstate__`'s state (or `load`'s). """
+        settings = state['settings']
+        ConcurrentUnrolledLinkedList.__init__(
+            self, chain.from_iterable(state['data_lists']),
+            max_node_capacity=settings['max_node_capacity'],
+            compact=settings['compact'], typecode=settings['typecode'])
+
+    @classmethod
+    def load(cls, fp, lazy=False):
+        """ Reads a list written by `dump`. The pages are always read in
+        full, so that lookups don't load them concurrently.
+        """
+        return super(ConcurrentUnrolledLinkedList, cls).load(fp)
+
+    # Methods that only read the list hold the lock for reading, and those
+    # that may relink nodes hold it for writing
+    __getitem__ = _locked('__getitem__')
+    __contains__ = _locked('__contains__')
+    __add__ = _locked('__add__')
+    __mul__ = _locked('__mul__')
+    __getstate__ = _locked('__getstate__')
+    __sizeof__ = _locked('__sizeof__')
+    __str__ = _locked('__str__')
+    index = _locked('index')
+    count = _locked('count')
+    dump = _locked('dump')
+    sum = _locked('sum')
+    min = _locked('min')
+    max = _locked('max')
+    mean = _locked('mean')
+    argmax = _locked('argmax')
+    to_numpy = _locked('to_numpy')
+    filter = _locked('filter')
+    memory_usage = _locked('memory_usage')
+    fill_histogram = _locked('fill_histogram')
+    writelines = _locked('writelines')
+    parallel_map = _locked('parallel_map')
+    parallel_filter = _locked('parallel_filter')
+    parallel_reduce = _locked('parallel_reduce')
+    _locate = _locked('_locate')
+
+    __delitem__ = _locked('__delitem__', write=True)
+    __iadd__ = _locked('__iadd__', write=True)
+    __imul__ = _locked('__imul__', write=True)
+    append = _locked('append', write=True)
+    extend = _locked('extend', write=True)
+    appendleft = _locked('appendleft', write=True)
+    extendleft = _locked('extendleft', write=True)
+    pop = _locked('pop', write=True)
+    popleft = _locked('popleft', write=True)
+    remove = _locked('remove', write=True)
+    clear = _locked('clear', write=True)
+    compact = _locked('compact', write=True)
+    enable_stats = _locked('enable_stats', write=True)
+    disable_stats = _locked('disable_stats', write=True)
+    _insert_at = _locked('_insert_at', write=True)
+    _take_head = _locked('_take_head', write=True)
+    _delete_at = _locked('_delete_at', write=True)